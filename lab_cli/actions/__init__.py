@@ -1,25 +1,102 @@
+import sys
+import importlib
+from functools import lru_cache
+
 # Define the Registry
 registry = {}
 
 # Define the Decorator
 def register_action(name):
     def decorator(func):
+        existing = registry.get(name)
+        if existing is not None and existing is not func:
+            # Duplicate names are a bug in debug runs; otherwise keep the first
+            if __debug__:
+                raise ValueError(f"Duplicate action name: '{name}'")
+            return func
         registry[name] = func
+        _resolve.cache_clear()
         return func
     return decorator
 
+# Action plugins (modules in this package), imported on first use so
+# commands that never touch actions (status, inspect, manage) skip the
+# hardware SDK imports
+_PLUGIN_MAP = {
+    "laser": ".laser_actions",
+    "cryo": ".cryo_actions",
+    "general": ".general_actions",
+}
+_loaded_plugins = set()
+
+# Plugin defining each action, so looking up one action imports only its
+# module. Actions missing here are found by loading every plugin.
+_ACTION_MODULES = {
+    "enable-power-stabilization": "laser",
+    "set-laser-power": "laser",
+    "sweep-laser": "laser",
+    "set-field": "cryo",
+    "set-temp": "cryo",
+    "toggle-pump": "cryo",
+    "wait-stable": "cryo",
+    "magnet-zero": "cryo",
+    "system-state": "cryo",
+    "delay": "general",
+    "log": "general",
+}
+
+def _ensure_plugins(*names):
+    """
+    Imports the named plugins (all of them by default), which runs their
+    @register_action decorators. Each plugin is attempted only once.
+    """
+    for name in names or _PLUGIN_MAP:
+        if name in _loaded_plugins:
+            continue
+        _loaded_plugins.add(name)
+        try:
+            importlib.import_module(_PLUGIN_MAP[name], __name__)
+        except ImportError as e:
+            print(f"[Warning] Failed to load some actions: {e}")
+
 # Define Helper Functions
 def get_all_actions():
     """
     Returns the FULL registry dictionary.
     Format: {'command_name': function_object}
     """
+    _ensure_plugins()
     # Return the dict, not a list of keys
     return registry
 
 def get_action(name):
     """Returns the function object for a specific command name."""
-    return registry.get(name)
+    func = registry.get(name)
+    if func is None:
+        plugin = _ACTION_MODULES.get(name)
+        if plugin is not None:
+            _ensure_plugins(plugin)
+            func = registry.get(name)
+        if func is None:
+            _ensure_plugins()
+            func = registry.get(name)
+    return func
+
+@lru_cache(maxsize=512)
+def _resolve(raw_input):
+    """
+    Parses a raw command string into (cmd_name, function, args).
+    Cached so replayed scripts skip re-splitting and the registry lookup.
+    """
+    # Split off the command name only; the tail is tokenized on a hit
+    parts = raw_input.split(None, 1)
+    if not parts:
+        return None, None, ()
+
+    cmd_name = sys.intern(parts[0])
+    func = registry.get(cmd_name)
+    args = tuple(parts[1].split()) if func is not None and len(parts) > 1 else ()
+    return cmd_name, func, args
 
 def handle_command(raw_input):
     """
@@ -32,17 +109,15 @@ def handle_command(raw_input):
     if not raw_input:
         return
 
-    parts = raw_input.strip().split()
-    if not parts:
+    _ensure_plugins()
+    cmd_name, func, args = _resolve(raw_input)
+    if cmd_name is None:
         return
 
-    cmd_name = parts[0]
-    args = parts[1:]
-
-    if cmd_name in registry:
+    if func is not None:
         try:
             # Execute the function with arguments
-            result = registry[cmd_name](*args)
+            result = func(*args)
             return result
         except TypeError as e:
             print(f"[Error] Argument mismatch for '{cmd_name}': {e}")
@@ -53,12 +128,3 @@ def handle_command(raw_input):
     else:
         print(f"[Error] Unknown command: '{cmd_name}'")
         return False
-
-# Import Plugins Last (Required to fill the registry)
-# This executes the decorator @register_action in those files
-try:
-    from . import laser_actions
-    from . import cryo_actions
-    from . import general_actions
-except ImportError as e:
-    print(f"[Warning] Failed to load some actions: {e}")
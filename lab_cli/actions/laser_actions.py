@@ -1,35 +1,169 @@
 # Last updated 19 Jan 2026
 import os
 import time
-import pandas as pd
-import matplotlib.pyplot as plt
-from datetime import datetime
+import atexit
+import functools
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from rich.console import Console
 from . import register_action
 from ..equipment_api import EQUIPMENT_CONFIG
 
 # Toptica Import logic
 try:
-    from toptica.lasersdk.dlcpro.v2_0_3 import DLCpro, NetworkConnection
+    from toptica.lasersdk.dlcpro.v2_0_3 import DLCpro, NetworkConnection, DecopError
     from toptica.lasersdk.utils.dlcpro import extract_float_arrays
     HAS_SDK = True
 except ImportError:
     HAS_SDK = False
 
 console = Console()
+logger = logging.getLogger(__name__)
+
+# Recorder get_data() sizing: the whole trace is requested in one call and
+# halved on rejection down to RECORDER_MIN_CHUNK; the size that worked is
+# remembered in _recorder_chunk for later sweeps
+RECORDER_MIN_CHUNK = 1024
+_recorder_chunk = None
+
+# Pooled DLCpro connections keyed by IP: {ip: (dlc, last_used)} (see dlc_session)
+_DLC_POOL = {}
+# Pooled connections idle longer than this (s) are reopened on next use
+DLC_IDLE_TIMEOUT = 300.0
+# Per-thread flag set when an SDK call failed inside the current dlc_session,
+# even if the caller handled the error (see _note_dlc_failure)
+_dlc_state = threading.local()
+
+# Probed laser1 features per pooled connection: {id(dlc): frozenset} (see _laser_caps)
+_LASER_CAPS = {}
+
+# Working setter per (type(obj), param_name) (see _force_set). Only setters
+# that write through the SDK are remembered; the private-attribute fallback
+# just rebinds a Python attribute and never reaches the device.
+_SETTER_CACHE = {}
+_CACHEABLE_SETTERS = frozenset({"set_direct", "set_private_obj"})
+
+# Output folders already created by this process (see action_sweep)
+_CREATED_DIRS = set()
+
+# Single writer thread for sweep files, plus its unfinished saves (see _submit_save)
+_SAVE_POOL = ThreadPoolExecutor(max_workers=1)
+_PENDING_SAVES = []
+
+# Sweep plot figure/axes/line, reused across sweeps (see _get_sweep_plot)
+_FIG = None
+_AX = None
+_LINE = None
+
+@functools.lru_cache(maxsize=8)
+def _dlc_ip(conf_key):
+    """
+    IP of a configured laser; raises KeyError/TypeError if it is missing.
+    EQUIPMENT_CONFIG is fixed for a session, so found IPs are cached (failed
+    lookups are not); call _dlc_ip.cache_clear() after changing it.
+    """
+    return EQUIPMENT_CONFIG[conf_key]["ip"]
 
 def _get_dlc_connection(conf_key="laser-01"):
-    """Helper to get DLC connection details."""
+    """
+    Helper to get DLC connection details.
+    """
     if not HAS_SDK:
         console.print("[red]Toptica SDK missing.[/red]")
         return None, None
 
-    conf = EQUIPMENT_CONFIG.get(conf_key)
-    if not conf:
+    try:
+        ip = _dlc_ip(conf_key)
+    except (KeyError, TypeError):
         console.print(f"[red]Configuration for {conf_key} not found.[/red]")
         return None, None
 
-    return conf["ip"], DLCpro
+    return ip, DLCpro
+
+@contextmanager
+def dlc_session(conf_key="laser-01"):
+    """
+    Yields an open DLCpro connection for 'conf_key' from the pool, so
+    consecutive actions skip the TCP + SDK handshake. A connection that saw
+    any error (raised out of the block, or handled and reported with
+    _note_dlc_failure) is closed and recreated on next use.
+    """
+    ip, _ = _get_dlc_connection(conf_key)
+    now = time.monotonic()
+    dlc, last_used = _DLC_POOL.pop(ip, (None, now))
+
+    if dlc is not None and now - last_used > DLC_IDLE_TIMEOUT:
+        _discard_dlc(dlc)
+        dlc = None
+
+    if dlc is None:
+        dlc = DLCpro(NetworkConnection(ip))
+        dlc.open()
+
+    # Nested sessions use their own connection, so keep the outer flag aside
+    outer_failed = getattr(_dlc_state, "failed", False)
+    _dlc_state.failed = False
+    broken = False
+    try:
+        yield dlc
+    except BaseException:
+        # SDK errors, timeouts, resets, Ctrl+C mid-request: the connection
+        # may be half-way through a reply, so do not return it to the pool
+        broken = True
+        raise
+    finally:
+        broken = broken or _dlc_state.failed
+        _dlc_state.failed = outer_failed
+        if broken:
+            _discard_dlc(dlc)
+        else:
+            # A nested or concurrent session may have pooled its own
+            # connection meanwhile; close that one rather than leak it
+            replaced, _ = _DLC_POOL.get(ip, (None, None))
+            _DLC_POOL[ip] = (dlc, time.monotonic())
+            if replaced is not None and replaced is not dlc:
+                _discard_dlc(replaced)
+
+def _note_dlc_failure():
+    """Marks the current dlc_session's connection as suspect after a handled SDK error."""
+    _dlc_state.failed = True
+
+def _discard_dlc(dlc):
+    """Closes a connection and forgets its probed capabilities."""
+    _LASER_CAPS.pop(id(dlc), None)
+    try: dlc.close()
+    except Exception: pass
+
+def _close_dlc_connections():
+    """Closes all pooled DLCpro connections (registered with atexit)."""
+    for dlc, _ in _DLC_POOL.values():
+        _discard_dlc(dlc)
+    _DLC_POOL.clear()
+
+def _laser_caps(dlc):
+    """
+    Returns the optional laser1 features of this connection as a frozenset
+    ('power_stabilization', 'ctl', 'ctl_power'). Each hasattr() probe goes
+    through the SDK, so they run once per pooled connection.
+    """
+    caps = _LASER_CAPS.get(id(dlc))
+    if caps is None:
+        laser = dlc.laser1
+        found = set()
+        if hasattr(laser, 'power_stabilization'):
+            found.add('power_stabilization')
+        if hasattr(laser, 'ctl'):
+            found.add('ctl')
+            if hasattr(laser.ctl, 'power'):
+                found.add('ctl_power')
+        caps = _LASER_CAPS[id(dlc)] = frozenset(found)
+    return caps
+
+atexit.register(_close_dlc_connections)
 
 def _get_val(obj):
     """
@@ -39,51 +173,336 @@ def _get_val(obj):
         return obj.get()
     return obj
 
-def _force_set(obj, param_name, value):
+def _setter_strategies(param_name):
     """
-    Robust setter that handles read-only properties by accessing private
-    backing attributes or calling .set() methods.
+    Candidate setters for 'param_name', in the order they are tried.
+    Each takes (obj, value) and raises if it does not apply.
     """
-    # 1. Try Direct Assignment (Standard)
-    try:
-        setattr(obj, param_name, value)
-        return True
-    except AttributeError:
-        pass # Expected for read-only properties
-
-    # 2. Try Private Attribute with .set() (Common Toptica pattern)
     private_name = f"_{param_name}"
-    if hasattr(obj, private_name):
-        internal_obj = getattr(obj, private_name)
+    setter_name = f"{param_name}_set"
 
-        # Method A: Call .set() on the private object
-        if hasattr(internal_obj, 'set'):
-            try:
-                internal_obj.set(value)
-                return True
-            except Exception as e:
-                console.print(f"[yellow]Debug: {private_name}.set() failed: {e}[/yellow]")
+    # 1. Direct Assignment (Standard)
+    def set_direct(obj, value):
+        setattr(obj, param_name, value)
 
-        # Method B: Direct assignment to private var
-        try:
-            setattr(obj, private_name, value)
-            return True
-        except Exception:
-            pass
+    # 2. Private object with .set() (Common Toptica pattern)
+    def set_private_obj(obj, value):
+        getattr(obj, private_name).set(value)
 
-    # 3. Check for specific '_set' suffix
-    setter_name = f"{param_name}_set"
-    if hasattr(obj, setter_name):
+    # 3. Direct assignment to private var
+    def set_private_attr(obj, value):
+        getattr(obj, private_name)
+        setattr(obj, private_name, value)
+
+    # 4. Specific '_set' suffix
+    def set_suffix(obj, value):
         target = getattr(obj, setter_name)
         if callable(target):
             target(value)
         else:
             setattr(obj, setter_name, value)
+
+    return (set_direct, set_private_obj, set_private_attr, set_suffix)
+
+def _force_set(obj, param_name, value):
+    """
+    Robust setter that handles read-only properties by accessing private
+    backing attributes or calling .set() methods. A strategy that writes
+    through the SDK is cached per (type(obj), param_name), since SDK node
+    classes are static.
+    """
+    key = (type(obj), param_name)
+    cached = _SETTER_CACHE.get(key)
+    if cached is not None:
+        try:
+            cached(obj, value)
+            return True
+        except Exception:
+            _note_dlc_failure()
+            del _SETTER_CACHE[key] # Re-probe below
+
+    for setter in _setter_strategies(param_name):
+        try:
+            setter(obj, value)
+        except AttributeError:
+            continue # Expected for read-only properties / missing attributes
+        except Exception as e:
+            logger.debug("%s(%s) failed: %s", setter.__name__, param_name, e)
+            _note_dlc_failure()
+            continue
+        if setter.__name__ in _CACHEABLE_SETTERS:
+            _SETTER_CACHE[key] = setter
         return True
 
     console.print(f"[red]Error: Could not set '{param_name}' - No setter found.[/red]")
     return False
 
+def _force_set_many(obj, settings):
+    """
+    Applies a list of (param_name, value) writes to one SDK node in a single
+    pass. Stops at the first write that fails.
+    """
+    for param_name, value in settings:
+        if not _force_set(obj, param_name, value):
+            return False
+    return True
+
+def _is_device_rejection(e) -> bool:
+    """
+    True if the laser answered a command with an error reply, which the SDK
+    raises as a plain DecopError (its subclasses cover timeouts, closed
+    connections and value conversion).
+    """
+    return HAS_SDK and type(e) is DecopError
+
+def _fetch_recorder_xy(recorder_data, total_samples: int):
+    """
+    Reads the recorder's x/y traces, asking for all samples in one request
+    first. If the laser rejects the request, the chunk is halved and the
+    fetch retried (down to RECORDER_MIN_CHUNK); other errors are raised.
+    """
+    global _recorder_chunk
+    total_samples = max(total_samples, 0)
+    chunk = min(_recorder_chunk or total_samples, total_samples)
+
+    while True:
+        try:
+            result = _fetch_recorder_chunks(recorder_data, total_samples, max(chunk, 1))
+        except Exception as e:
+            # Timeouts, dropped connections and parse errors are not about
+            # the size; smaller requests would only fail the same way
+            if chunk <= RECORDER_MIN_CHUNK or not _is_device_rejection(e):
+                raise
+            chunk = max(chunk // 2, RECORDER_MIN_CHUNK)
+            console.print(f"[yellow]Recorder fetch failed ({e}), retrying with {chunk}-sample chunks...[/yellow]")
+            continue
+
+        if chunk < total_samples:
+            _recorder_chunk = chunk
+        return result
+
+def _fetch_recorder_chunks(recorder_data, total_samples: int, chunk: int):
+    """
+    Reads the recorder's x/y traces into preallocated float64 arrays.
+    The next chunk is requested on a worker thread while the current one is
+    parsed, so network transfer and parsing overlap.
+    """
+    x_data = np.empty(total_samples, dtype=np.float64)
+    y_data = np.empty_like(x_data)
+    filled = 0
+
+    def fetch(index):
+        return recorder_data.get_data(index, min(chunk, total_samples - index))
+
+    starts = deque(range(0, total_samples, chunk))
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        # Keep one request queued behind the one being transferred
+        in_flight = deque()
+        while starts and len(in_flight) < 2:
+            in_flight.append(pool.submit(fetch, starts.popleft()))
+
+        try:
+            while in_flight:
+                raw = in_flight.popleft().result()
+                if starts:
+                    in_flight.append(pool.submit(fetch, starts.popleft()))
+
+                # The SDK owns the recorder's binary layout, so parsing stays in
+                # extract_float_arrays; NumPy converts its lists in one C pass.
+                xy = extract_float_arrays('xy', raw)
+                xs, ys = xy.get('x', ()), xy.get('y', ())
+                n = min(len(xs), len(ys))
+                if len(xs) != n: xs = xs[:n]
+                if len(ys) != n: ys = ys[:n]
+                x_data[filled:filled + n] = xs
+                y_data[filled:filled + n] = ys
+                filled += n
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    return x_data[:filled], y_data[:filled]
+
+def _subscribe_scan_done(dlc, state_param, done):
+    """
+    Subscribes to wide-scan state changes so 'done' is set as soon as the
+    state reaches 0. Returns the subscription, or None if unsupported.
+    Callbacks only run inside dlc.run()/dlc.poll(); on completion the
+    callback stops a running dlc.run().
+    """
+    subscribe = getattr(state_param, 'subscribe', None)
+    if subscribe is None:
+        return None
+
+    def on_change(*args):
+        # SDK callbacks pass the new value last
+        try:
+            if _get_val(args[-1]) == 0:
+                done.set()
+                dlc.stop()
+        except Exception:
+            pass
+
+    try:
+        return subscribe(on_change)
+    except Exception:
+        return None
+
+def _wait_for_sweep(dlc, duration: float, max_wait_time: float):
+    """
+    Blocks until the wide scan reports state 0 or max_wait_time elapses.
+    Each wait step runs the SDK's event loop (dlc.run), so a state
+    subscription ends the wait as soon as the scan completes; adaptive
+    polling of the state remains as the fallback.
+    """
+    wide_scan = dlc.laser1.wide_scan
+    start_time = time.time()
+    console.print(f"[cyan]Waiting for sweep (Max wait: {max_wait_time:.1f}s)...[/cyan]")
+
+    done = threading.Event()
+    subscription = _subscribe_scan_done(dlc, wide_scan.state, done)
+
+    last_state = -99
+    consecutive_same_state = 0
+
+    try:
+        while True:
+            if done.is_set():
+                console.print("\n[green]Sweep Complete (State 0).[/green]")
+                return
+
+            # Check for Timeout
+            elapsed = time.time() - start_time
+            if elapsed > max_wait_time:
+                console.print(f"\n[bold red]TIMEOUT: Sweep took longer than {max_wait_time:.1f}s.[/bold red]")
+                try: wide_scan.stop()
+                except: pass
+                return
+
+            # Read State
+            try:
+                current_state = _get_val(wide_scan.state)
+            except Exception:
+                current_state = -1
+
+            if current_state == 0:
+                console.print("\n[green]Sweep Complete (State 0).[/green]")
+                return
+
+            if current_state != last_state:
+                console.print(f"Laser State: {current_state} (Scanning...)")
+                last_state = current_state
+                consecutive_same_state = 0
+
+            # Adaptive poll: coarse early, fine around the expected end,
+            # exponential back-off (max 5 s) if the scan overruns unchanged
+            elapsed = time.time() - start_time
+            if elapsed < duration * 0.8:
+                sleep_s = min(2.0, max(0.1, duration * 0.8 - elapsed))
+            elif elapsed < duration * 1.2:
+                sleep_s = 0.1
+            else:
+                sleep_s = min(0.1 * 2 ** consecutive_same_state, 5.0)
+                consecutive_same_state += 1
+
+            wait_s = max(0.01, min(sleep_s, max_wait_time - elapsed))
+            if subscription is not None:
+                # The synchronous SDK delivers subscription updates only
+                # while dlc.run() runs; it returns early on completion
+                try:
+                    dlc.run(wait_s)
+                    continue
+                except Exception:
+                    # No monitoring line: plain polling from here on
+                    try: subscription.cancel()
+                    except Exception: pass
+                    subscription = None
+            time.sleep(wait_s)
+    finally:
+        if subscription is not None:
+            try: subscription.cancel()
+            except Exception: pass
+
+def _get_sweep_plot():
+    """
+    Returns the shared (figure, axes, line) used for sweep plots, creating
+    it on first use with the non-interactive Agg backend. Labels and grid
+    are set once; each sweep only swaps the line data and title.
+    """
+    global _FIG, _AX, _LINE
+    if _FIG is None:
+        import matplotlib
+        matplotlib.use("Agg", force=True)
+        import matplotlib.pyplot as plt
+        plt.style.use("fast")
+        _FIG, _AX = plt.subplots()
+        (_LINE,) = _AX.plot([], [])
+        _AX.set_xlabel("Wavelength (nm)")
+        _AX.set_ylabel("Intensity")
+        _AX.grid(True)
+    return _FIG, _AX, _LINE
+
+def _save_sweep(x_data, y_data, filename_base, file_format, title):
+    """Writes the sweep data file and the preview PNG."""
+    # Imported here so CLI start-up does not pay for it
+    import pandas as pd
+
+    # Wrap the acquisition arrays rather than copying them
+    df = pd.DataFrame({"Wavelength": x_data, "Intensity": y_data}, copy=False)
+
+    # Parquet by default; blank (e.g. from a recipe) means default
+    fmt = (file_format or "parquet").strip().lower()
+    if fmt == "xlsx":
+        # xlsxwriter streams rows instead of holding the workbook
+        with pd.ExcelWriter(f"{filename_base}.xlsx", engine="xlsxwriter",
+                            engine_kwargs={"options": {"constant_memory": True}}) as writer:
+            df.to_excel(writer, index=False)
+    elif fmt == "csv":
+        df.to_csv(f"{filename_base}.csv", index=False)
+    else:
+        if fmt != "parquet":
+            console.print(f"[yellow]Unknown format '{file_format}', using parquet.[/yellow]")
+        try:
+            df.to_parquet(f"{filename_base}.parquet", compression="zstd")
+        except ImportError:
+            console.print("[yellow]pyarrow not installed, saving CSV instead.[/yellow]")
+            df.to_csv(f"{filename_base}.csv", index=False)
+
+    fig, ax, line = _get_sweep_plot()
+    line.set_data(x_data, y_data)
+    ax.relim()
+    ax.autoscale_view()
+    ax.set_title(title)
+    # Preview only: low dpi and no tight-bbox second pass
+    fig.savefig(f"{filename_base}.png", dpi=72, bbox_inches=None, pad_inches=0)
+    console.print(f"[green]Saved: {os.path.basename(filename_base)}[/green]")
+
+def _on_save_done(future):
+    """Reports a failed background save."""
+    exc = future.exception()
+    if exc is not None:
+        console.print(f"[red]Saving sweep failed: {exc}[/red]")
+
+def _submit_save(x_data, y_data, filename_base, file_format, title):
+    """
+    Queues _save_sweep on the single writer thread so the action returns as
+    soon as the data is in memory. Saves run in submission order.
+    """
+    _PENDING_SAVES[:] = [f for f in _PENDING_SAVES if not f.done()]
+    future = _SAVE_POOL.submit(_save_sweep, x_data, y_data, filename_base, file_format, title)
+    future.add_done_callback(_on_save_done)
+    _PENDING_SAVES.append(future)
+
+def _wait_for_saves():
+    """Blocks until all queued sweep saves are written (registered with atexit)."""
+    for future in _PENDING_SAVES:
+        try: future.result()
+        except Exception: pass # Already reported by _on_save_done
+    _PENDING_SAVES.clear()
+
+atexit.register(_wait_for_saves)
+
 def _internal_set_power(dlc, power_mw: float):
     """
     Helper function to set laser power (mW).
@@ -91,14 +510,14 @@ def _internal_set_power(dlc, power_mw: float):
     console.print(f"Setting power to {power_mw} mW...")
     try:
         # Method 1: Power Stabilization
-        if hasattr(dlc.laser1, 'power_stabilization'):
+        if 'power_stabilization' in _laser_caps(dlc):
             _force_set(dlc.laser1.power_stabilization, 'enabled', True)
             _force_set(dlc.laser1.power_stabilization, 'setpoint', float(power_mw))
             console.print("[green]Power Stabilization Enabled & Set.[/green]")
             return True
 
         # Method 2: Direct CTL Power
-        elif hasattr(dlc.laser1, 'ctl') and hasattr(dlc.laser1.ctl, 'power'):
+        elif 'ctl_power' in _laser_caps(dlc):
             _force_set(dlc.laser1.ctl, 'power', float(power_mw))
             return True
 
@@ -107,6 +526,7 @@ def _internal_set_power(dlc, power_mw: float):
             return False
 
     except Exception as e:
+        _note_dlc_failure()
         console.print(f"[yellow]Warning: Failed to set power: {e}[/yellow]")
         return False
 
@@ -119,8 +539,8 @@ def action_enable_stabilization(state: int):
     if not ip: return False
 
     try:
-        with DLCpro(NetworkConnection(ip)) as dlc:
-            if not hasattr(dlc.laser1, 'power_stabilization'):
+        with dlc_session() as dlc:
+            if 'power_stabilization' not in _laser_caps(dlc):
                 console.print("[red]Error: No Power Stabilization module.[/red]")
                 return False
 
@@ -144,7 +564,7 @@ def action_set_power(power: float):
     if not ip: return False
 
     try:
-        with DLCpro(NetworkConnection(ip)) as dlc:
+        with dlc_session() as dlc:
             success = _internal_set_power(dlc, power)
             if success:
                 console.print(f"[green]Laser power updated to {power} mW.[/green]")
@@ -156,89 +576,70 @@ def action_set_power(power: float):
 
 @register_action("sweep-laser")
 def action_sweep(start_nm: float, end_nm: float, speed: float, power: float,
-                 context: dict = None):
+                 file_format: str = "parquet", context: dict = None):
     """
     Performs a wide scan sweep and saves data to a date-specific folder.
     Filename includes speed, power, and range.
+    file_format: 'parquet' (default, CSV if pyarrow is missing), 'csv' or 'xlsx'.
     """
     ip, _ = _get_dlc_connection()
     if not ip: return False
 
     # Folder and filename logic
     # 1. Create Folder based on Date (e.g., 19012026)
-    date_str = datetime.now().strftime("%d%m%Y")
+    date_str = time.strftime("%d%m%Y")
     folder = os.path.join("Data_Sweeps", date_str)
-    if not os.path.exists(folder): os.makedirs(folder)
+    if folder not in _CREATED_DIRS:
+        os.makedirs(folder, exist_ok=True)
+        _CREATED_DIRS.add(folder)
 
     # 2. Build Suffix from Loop Variables (e.g., _field_0.1)
-    suffix = ""
-    if context:
-        for k, v in context.items():
-            suffix += f"_{k}_{v}"
+    suffix = "".join(f"_{k}_{v}" for k, v in (context or {}).items())
 
     # 3. Construct Descriptive Filename (No timestamp)
     # Format: Sweep_1530-1535nm_5nmps_0.7mW_field_0.1
     filename_str = f"Sweep_{start_nm}-{end_nm}nm_{speed}nmps_{power}mW{suffix}"
     filename_base = os.path.join(folder, filename_str)
 
+    # Cast once (after naming, so filenames keep the values as typed)
+    start_nm, end_nm = float(start_nm), float(end_nm)
+    speed, power = float(speed), float(power)
+
     try:
-        with DLCpro(NetworkConnection(ip)) as dlc:
+        with dlc_session() as dlc:
             # 1. Set Power
             _internal_set_power(dlc, power)
 
             console.print(f"Sweeping {start_nm}-{end_nm} nm @ {speed} nm/s...")
 
-            # 2. Setup Sweep Parameters
-            if not _force_set(dlc.laser1.wide_scan, 'scan_begin', float(start_nm)):
-                return False
-            _force_set(dlc.laser1.wide_scan, 'scan_end', float(end_nm))
-            _force_set(dlc.laser1.wide_scan, 'speed', float(speed))
-
-            # 3. Setup Recorder
-            scan_range = abs(float(end_nm) - float(start_nm))
-            duration = scan_range / float(speed)
+            # 2. Timing
+            scan_range = abs(end_nm - start_nm)
+            duration = scan_range / speed
 
             # Safety buffer
             timeout_buffer = max(10.0, duration * 0.2)
             max_wait_time = duration + timeout_buffer
 
-            _force_set(dlc.laser1.recorder, 'sampling_rate', 100.0)
-            _force_set(dlc.laser1.recorder, 'recording_time', duration + 2.0)
+            # 3. Setup Sweep + Recorder Parameters (queued, applied in one pass)
+            scan_settings = [
+                ('scan_begin', start_nm),
+                ('scan_end', end_nm),
+                ('speed', speed),
+            ]
+            recorder_settings = [
+                ('sampling_rate', 100.0),
+                ('recording_time', duration + 2.0),
+            ]
+
+            if not _force_set_many(dlc.laser1.wide_scan, scan_settings):
+                return False
+            _force_set_many(dlc.laser1.recorder, recorder_settings)
 
             # 4. Start Sweep
             dlc.laser1.wide_scan.start()
 
             # 5. Monitor State with Timeout
-            start_time = time.time()
-            console.print(f"[cyan]Waiting for sweep (Max wait: {max_wait_time:.1f}s)...[/cyan]")
-
-            last_state = -99
-
-            while True:
-                # Check for Timeout
-                elapsed = time.time() - start_time
-                if elapsed > max_wait_time:
-                    console.print(f"\n[bold red]TIMEOUT: Sweep took longer than {max_wait_time:.1f}s.[/bold red]")
-                    try: dlc.laser1.wide_scan.stop()
-                    except: pass
-                    break
-
-                # Read State
-                try:
-                    raw_state = dlc.laser1.wide_scan.state
-                    current_state = _get_val(raw_state)
-                except Exception:
-                    current_state = -1
-
-                if current_state == 0:
-                    console.print("\n[green]Sweep Complete (State 0).[/green]")
-                    break
-
-                if current_state != last_state:
-                    console.print(f"Laser State: {current_state} (Scanning...)")
-                    last_state = current_state
-
-                time.sleep(0.5)
+            _wait_for_sweep(dlc, duration, max_wait_time)
 
             # 6. Fetch Data
             raw_count = dlc.laser1.recorder.data.recorded_sample_count
@@ -246,39 +647,17 @@ def action_sweep(start_nm: float, end_nm: float, speed: float, power: float,
 
             console.print(f"Acquiring {total_samples} samples...")
 
-            x_data = []
-            y_data = []
-
-            if total_samples > 0:
-                index = 0
-                while index < total_samples:
-                    chunk = min(1024, total_samples - index)
-                    raw = dlc.laser1.recorder.data.get_data(index, chunk)
-
-                    xy = extract_float_arrays('xy', raw)
-                    if 'x' in xy: x_data.extend(xy['x'])
-                    if 'y' in xy: y_data.extend(xy['y'])
-
-                    index += chunk
-
-            # 7. Save Data
-            if x_data and y_data:
-                df = pd.DataFrame({"Wavelength": x_data, "Intensity": y_data})
-                df.to_excel(f"{filename_base}.xlsx", index=False)
+            x_data, y_data = _fetch_recorder_xy(dlc.laser1.recorder.data, total_samples)
 
+            # 7. Save Data (in the background; see _submit_save)
+            if len(x_data) > 0:
                 # Plot title logic
                 clean_title = (f"Scan: {start_nm}-{end_nm}nm | Speed: {speed}nm/s | "
                                f"Power: {power}mW\n{suffix.replace('_', ' ').strip()}")
 
-                plt.figure()
-                plt.plot(df["Wavelength"], df["Intensity"])
-                plt.title(clean_title)
-                plt.xlabel("Wavelength (nm)")
-                plt.ylabel("Intensity")
-                plt.grid(True)
-                plt.savefig(f"{filename_base}.png")
-                plt.close()
-                console.print(f"[green]Saved: {os.path.basename(filename_base)}[/green]")
+                _submit_save(x_data, y_data, filename_base, file_format, clean_title)
+                console.print(f"[green]Acquired {len(x_data)} samples, saving "
+                              f"{os.path.basename(filename_base)}...[/green]")
                 return True
             else:
                 console.print("[red]No data recorded.[/red]")
@@ -286,6 +665,6 @@ def action_sweep(start_nm: float, end_nm: float, speed: float, power: float,
 
     except Exception as e:
         console.print(f"[red]Sweep Failed: {e}[/red]")
-        import traceback
-        traceback.print_exc()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Sweep failure traceback", exc_info=True)
         return False
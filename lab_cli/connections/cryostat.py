@@ -1,29 +1,54 @@
 import sys
+import importlib.util
+import atexit
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import socket
 import struct
+import threading
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 
 CRYO_PORT = 2224
+# 2-byte big-endian length prefix used by the command protocol
+_HDR = struct.Struct('>H')
+# Receive buffer for command responses; grown per call if a reply is longer
+CRYO_RECV_SIZE = 4096
+# Kernel send/receive buffer size for the command socket
+CRYO_SOCKBUF = 65536
+
+# Open command sockets keyed by IP, reused across _send_cryo_command calls
+_cryo_sockets: dict = {}
+_cryo_sockets_lock = threading.Lock()
 
 # Dynamic Path Setup
-current_dir = Path(__file__).resolve().parent
-libs_path = current_dir.parent / "read_only" / "Python Montana examples" / "libs"
+@lru_cache(maxsize=1)
+def _locate_libs() -> Optional[str]:
+    """
+    Returns the Montana examples 'libs' folder, or None if scryostation is
+    already importable (or the folder cannot be found).
+    """
+    if importlib.util.find_spec("scryostation") is not None:
+        return None
+
+    current_dir = Path(__file__).resolve().parent
+    libs_path = current_dir.parent / "read_only" / "Python Montana examples" / "libs"
 
-if not libs_path.exists():
-    # Fallback for local testing if folder structure differs
-    libs_path = Path(r"C:\Users\qmqin\VSCode-v2\read_only\Python Montana examples\libs")
+    if not libs_path.exists():
+        # Fallback for local testing if folder structure differs
+        libs_path = Path(r"C:\Users\qmqin\VSCode-v2\read_only\Python Montana examples\libs")
 
-if libs_path.exists():
-    libs_path_str = str(libs_path)
-    if libs_path_str not in sys.path:
-        sys.path.append(libs_path_str)
+    return str(libs_path) if libs_path.exists() else None
+
+libs_path_str = _locate_libs()
+if libs_path_str and libs_path_str not in sys.path:
+    sys.path.append(libs_path_str)
 
 # Debugging
-#print(f"DEBUG: Looking for libs at: {libs_path}")
-#print(f"DEBUG: Path exists? {libs_path.exists()}")
+#print(f"DEBUG: Looking for libs at: {libs_path_str}")
 #print(f"DEBUG: Current sys.path: {sys.path}")
 
 # Import Library
@@ -33,19 +58,66 @@ except ImportError as e:
     print(f"DEBUG: Import failed details: {e}")
     scryostation = None
 
+# Optional faster JSON encoder for REST payloads
+try:
+    import orjson
+except ImportError:
+    orjson = None
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
 # Patch Requests
 _cryo_session = requests.Session()
+# Keep-alive pool without retries: status reads (library GETs, the magnet
+# safety loop) should fail after one timeout so the circuit breaker can act
+_cryo_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+# Setpoint PUTs get their own session, retrying only failed connects (a
+# request that reached the controller is never re-sent)
+_cryo_put_session = requests.Session()
+_cryo_put_session.mount("http://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=8,
+    max_retries=Retry(total=2, connect=2, read=0, backoff_factor=0.1),
+))
 def persistent_get(url, params=None, **kwargs):
     return _cryo_session.get(url=url, params=params, **kwargs)
 requests.get = persistent_get
 
+# Method names tried for each operation, in order (library versions and the
+# Magneto-Optic module use different naming conventions)
+_CRYO_METHOD_NAMES = {
+    "get_temperature": ("get_temperature",),
+    "get_pressure": ("get_pressure",),
+    "get_field": ("get_magnet_target_field", "getMagnetTargetField", "get_mo_target_field"),
+    "set_temperature": ("set_platform_target_temperature", "setRenderTargetTemperature"),
+    "set_magnet_state": ("set_magnet_state", "setMagnetState"),
+    "set_field": ("set_magnet_target_field", "setMagnetTargetField", "set_mo_target_field"),
+}
+
+@lru_cache(maxsize=16)
+def _get_cryo_client(ip: str):
+    """
+    Returns the SCryostation client for 'ip', created once and reused so
+    repeated calls keep the same session. Cleared after connection errors.
+    The available methods are resolved once and stored on 'client.bound'
+    (None where the library has no matching method).
+    """
+    client = scryostation.SCryostation(ip)
+    client.bound = {
+        op: next((getattr(client, n) for n in names if hasattr(client, n)), None)
+        for op, names in _CRYO_METHOD_NAMES.items()
+    }
+    return client
+
 # Helper: Direct REST Fallback
 def _send_rest_put(ip: str, endpoint: str, data_payload):
     """Sends a PUT request with correct JSON headers (Fix for Error 400)."""
     url = f"http://{ip}:47101/v1/{endpoint}"
-    headers = {'Content-Type': 'application/json'}
     try:
-        resp = requests.put(url, data=json.dumps(data_payload), headers=headers, timeout=5)
+        # The session keeps the connection open between calls
+        if orjson is not None:
+            resp = _cryo_put_session.put(url, data=orjson.dumps(data_payload),
+                                         headers=_JSON_HEADERS, timeout=5)
+        else:
+            resp = _cryo_put_session.put(url, json=data_payload, timeout=5)
         if resp.status_code in [200, 204]:
             return True, "Success"
         else:
@@ -59,21 +131,16 @@ def get_cryostat_details(ip: str) -> dict:
         return {"status": "Error", "details": "Library Import Failed"}
 
     try:
-        cryo = scryostation.SCryostation(ip)
+        bound = _get_cryo_client(ip).bound
 
         # Temp & Pressure
-        temp = cryo.get_temperature() if hasattr(cryo, 'get_temperature') else 0.0
-        pressure = cryo.get_pressure() if hasattr(cryo, 'get_pressure') else 0.0
-
-        # Magnet
-        field = 0.0
-        # Try different naming conventions for Magneto-Optic vs Standard
-        if hasattr(cryo, 'get_magnet_target_field'):
-            field = cryo.get_magnet_target_field()
-        elif hasattr(cryo, 'getMagnetTargetField'):
-             field = cryo.getMagnetTargetField()
-        elif hasattr(cryo, 'get_mo_target_field'): # Specific to Magneto-Optic
-             field = cryo.get_mo_target_field()
+        get_temp, get_pressure = bound["get_temperature"], bound["get_pressure"]
+        temp = get_temp() if get_temp else 0.0
+        pressure = get_pressure() if get_pressure else 0.0
+
+        # Magnet (standard or Magneto-Optic naming)
+        get_field = bound["get_field"]
+        field = get_field() if get_field else 0.0
 
         return {
             "status": "Active",
@@ -83,6 +150,7 @@ def get_cryostat_details(ip: str) -> dict:
             "details": "Connected"
         }
     except Exception as e:
+        _get_cryo_client.cache_clear()
         return {"status": "Connection Error", "details": str(e)}
 
 def set_temperature(ip: str, target_k: float) -> str:
@@ -90,13 +158,10 @@ def set_temperature(ip: str, target_k: float) -> str:
     if not scryostation: return "Library missing"
 
     try:
-        cryo = scryostation.SCryostation(ip)
         # Try Library Method
-        if hasattr(cryo, 'set_platform_target_temperature'):
-            cryo.set_platform_target_temperature(target_k)
-            return f"Command sent: Set Temp to {target_k} K"
-        elif hasattr(cryo, 'setRenderTargetTemperature'):
-            cryo.setRenderTargetTemperature(target_k)
+        set_temp = _get_cryo_client(ip).bound["set_temperature"]
+        if set_temp:
+            set_temp(target_k)
             return f"Command sent: Set Temp to {target_k} K"
 
         # Fallback to REST
@@ -104,6 +169,7 @@ def set_temperature(ip: str, target_k: float) -> str:
         return msg if not success else f"REST Command: Set Temp to {target_k} K"
 
     except Exception as e:
+        _get_cryo_client.cache_clear()
         return f"Error setting temp: {e}"
 
 def set_magnet_field(ip: str, target_tesla: float) -> str:
@@ -114,31 +180,22 @@ def set_magnet_field(ip: str, target_tesla: float) -> str:
     # Can add a software limit here
 
     try:
-        cryo = scryostation.SCryostation(ip)
+        bound = _get_cryo_client(ip).bound
 
         # Ensure Magnet is Enabled
         # Try library methods to enable
         try:
-            if hasattr(cryo, 'set_magnet_state'): cryo.set_magnet_state(True)
-            elif hasattr(cryo, 'setMagnetState'): cryo.setMagnetState(True)
+            if bound["set_magnet_state"]: bound["set_magnet_state"](True)
         except:
             pass # Continue to try setting field anyway
 
         # Set Field
-        # Try Library Method (Standard)
-        if hasattr(cryo, 'set_magnet_target_field'):
-            cryo.set_magnet_target_field(target_tesla)
-            return f"Command sent: Field {target_tesla} T"
-
-        # Try Library Method (CamelCase)
-        elif hasattr(cryo, 'setMagnetTargetField'):
-            cryo.setMagnetTargetField(target_tesla)
-            return f"Command sent: Field {target_tesla} T"
-
-        # Try Library Method (Magneto-Optic module specific)
-        elif hasattr(cryo, 'set_mo_target_field'):
-            cryo.set_mo_target_field(target_tesla)
-            return f"Command sent: MO Field {target_tesla} T"
+        # Try Library Method (Standard, CamelCase or Magneto-Optic specific)
+        set_field = bound["set_field"]
+        if set_field:
+            set_field(target_tesla)
+            label = "MO Field" if set_field.__name__ == "set_mo_target_field" else "Field"
+            return f"Command sent: {label} {target_tesla} T"
 
         # Fallback to REST
         success, msg = _send_rest_put(ip, "magnet/targetField", target_tesla)
@@ -150,40 +207,113 @@ def set_magnet_field(ip: str, target_tesla: float) -> str:
             return f"Failed to set field via Library or REST. {msg}"
 
     except Exception as e:
+        _get_cryo_client.cache_clear()
         return f"Error setting field: {e}"
 
-def _send_cryo_command(ip: str, cmd_str: str) -> str:
+def _configure_cryo_socket(s: socket.socket):
     """
-    Sends a text command to the Cryostation using the required 2-byte length
-    prefix protocol
+    Tunes a command socket for small request/response messages: no Nagle
+    delay, and keep-alive so an idle connection can be reused safely.
     """
+    s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, CRYO_SOCKBUF)
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, CRYO_SOCKBUF)
+
+    # Keep-alive timing (Linux only)
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30)
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10)
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)
+
+def _open_cryo_socket(ip: str) -> socket.socket:
+    """Opens and configures a new command socket to the Cryostation."""
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.settimeout(3.0) # Set a reasonable timeout
-            s.connect((ip, CRYO_PORT))
-
-            # Protocol: 2 bytes length + Command String
-            # Encode the length as a 2-byte unsigned short
-            # (Big Endian standard for network)
-            cmd_bytes = cmd_str.encode('ascii')
-            length_prefix = struct.pack('>H', len(cmd_bytes))
-
-            # Send full message
-            s.sendall(length_prefix + cmd_bytes)
-
-            # Receive Response Length (First 2 bytes)
-            resp_len_bytes = s.recv(2)
-            if not resp_len_bytes:
-                return "Error: No response"
-
-            resp_len = struct.unpack('>H', resp_len_bytes)[0]
-
-            # Receive Response Body
-            response = s.recv(resp_len).decode('ascii')
-            return response
+        s.settimeout(3.0) # Set a reasonable timeout
+        _configure_cryo_socket(s)
+        s.connect((ip, CRYO_PORT))
+    except Exception:
+        s.close()
+        raise
+    return s
+
+def _close_cryo_sockets():
+    """Closes every pooled command socket (registered with atexit)."""
+    with _cryo_sockets_lock:
+        for s in _cryo_sockets.values():
+            try:
+                s.close()
+            except OSError:
+                pass
+        _cryo_sockets.clear()
+
+atexit.register(_close_cryo_sockets)
+
+def _cryo_exchange(s: socket.socket, cmd_str: str) -> str:
+    """Sends one length-prefixed command on an open socket and reads the reply."""
+    # Protocol: 2 bytes length + Command String
+    # Encode the length as a 2-byte unsigned short
+    # (Big Endian standard for network)
+    cmd_bytes = cmd_str.encode('ascii')
+    length_prefix = _HDR.pack(len(cmd_bytes))
+
+    # Send full message
+    s.sendall(length_prefix + cmd_bytes)
+
+    # Receive the 2-byte length and the body into one buffer; TCP may split
+    # (or merge) them, so keep reading until the full message is in
+    buf = bytearray(CRYO_RECV_SIZE)
+    view = memoryview(buf)
+    off = 0
+    total = 2
+    while off < total:
+        n = s.recv_into(view[off:])
+        if not n:
+            raise ConnectionError("No response" if off == 0 else "Connection closed mid-response")
+        off += n
+        if total == 2 and off >= 2:
+            total = 2 + _HDR.unpack_from(buf)[0]
+            if total > len(buf):
+                # Longer than usual: move what we have into a buffer that fits
+                grown = bytearray(total)
+                grown[:off] = view[:off]
+                buf, view = grown, memoryview(grown)
+
+    return bytes(view[2:total]).decode('ascii')
 
-    except Exception as e:
-        return f"Error: {str(e)}"
+def _send_cryo_command(ip: str, cmd_str: str) -> str:
+    """
+    Sends a text command to the Cryostation using the required 2-byte length
+    prefix protocol. The socket is kept open and reused for the next command.
+    """
+    # The lock only guards the pool; the exchange itself runs unlocked, and
+    # concurrent commands to one IP each get their own socket
+    with _cryo_sockets_lock:
+        s = _cryo_sockets.pop(ip, None)
+    reused = s is not None
+    while True:
+        try:
+            if s is None:
+                s = _open_cryo_socket(ip)
+            response = _cryo_exchange(s, cmd_str)
+        except Exception as e:
+            if s is not None:
+                s.close()
+            # A pooled socket may have been dropped by the server; retry once
+            if reused:
+                s, reused = None, False
+                continue
+            return f"Error: {str(e)}"
+
+        # Keep one idle socket per IP; close ours if another got there first
+        with _cryo_sockets_lock:
+            if ip not in _cryo_sockets:
+                _cryo_sockets[ip], s = s, None
+        if s is not None:
+            s.close()
+        return response
 
 def set_vacuum_pump(ip: str, enable: bool) -> str:
     """
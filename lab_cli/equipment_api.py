@@ -1,6 +1,8 @@
 import time
-from typing import Dict, Optional, Any
-from datetime import datetime
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Any, Callable, Tuple
 
 # Import connection handlers
 from .connections.laser import get_laser_details
@@ -26,58 +28,257 @@ EQUIPMENT_CONFIG = {
     }
 }
 
-def get_all_equipment() -> Dict[str, Any]:
-    """Fetches live status from all configured devices."""
-    results = {}
+# Recent device reads: {(fetcher name, ip): (monotonic time, details)}
+_DETAILS_CACHE: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+_DETAILS_LOCK = threading.Lock()
+# Seconds a device read is reused before the hardware is queried again
+DETAILS_TTL = 0.5
+
+# Circuit breaker for unreachable devices: after BREAKER_THRESHOLD failed
+# reads in a row, the last error is returned for BREAKER_COOLDOWN seconds
+# instead of waiting on another connection timeout
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 30.0
+_FAILED_STATUSES = frozenset({"Connection Error", "Offline"})
+# {(fetcher name, ip): (consecutive failures, monotonic time of last, details)}
+_FAILURES: Dict[Tuple[str, str], Tuple[int, float, Dict[str, Any]]] = {}
+
+def _cached_details(fetch: Callable[[str], Dict[str, Any]], ip: str,
+                    ttl: float = DETAILS_TTL) -> Dict[str, Any]:
+    """
+    Returns fetch(ip), reusing a result younger than 'ttl' seconds so bursts
+    of status/inspect calls do not each hit the network. Devices that keep
+    failing are skipped during the breaker cool-down.
+    """
+    key = (fetch.__name__, ip)
+    now = time.monotonic()
+    with _DETAILS_LOCK:
+        hit = _DETAILS_CACHE.get(key)
+        fail = _FAILURES.get(key)
+    if hit and now - hit[0] < ttl:
+        return hit[1]
+    if fail and fail[0] >= BREAKER_THRESHOLD and now - fail[1] < BREAKER_COOLDOWN:
+        return fail[2]
+
+    details = fetch(ip)
+    done = time.monotonic()
+    with _DETAILS_LOCK:
+        _DETAILS_CACHE[key] = (done, details)
+        if details.get("status") in _FAILED_STATUSES:
+            count = _FAILURES.get(key, (0,))[0] + 1
+            _FAILURES[key] = (count, done, details)
+        else:
+            _FAILURES.pop(key, None)
+    return details
+
+# Upper bound on polling threads; larger setups queue behind these
+_MAX_POLL_WORKERS = 8
+
+# Shared pool for polling devices in parallel (see get_all_equipment)
+_POLL_POOL = ThreadPoolExecutor(
+    max_workers=max(1, min(len(EQUIPMENT_CONFIG), _MAX_POLL_WORKERS)),
+    thread_name_prefix="equipment-poll")
+
+def _mock_details(ip: str) -> Dict[str, Any]:
+    """Status for devices without a real driver."""
+    return {"status": "Idle", "details": "Mock Device"}
+
+# Connection handler per driver name
+_DRIVER_FETCHERS: Dict[str, Callable[[str], Dict[str, Any]]] = {
+    "toptica_dlc": get_laser_details,
+    "montana": get_cryostat_details,
+    "mock": _mock_details,
+}
+
+# (id, type, ip, fetcher) per configured device, resolved once at import;
+# fetcher is None for unknown drivers
+_DISPATCH: Tuple[Tuple[str, str, Optional[str], Optional[Callable]], ...] = tuple(
+    (eq_id, cfg["type"], cfg.get("ip"), _DRIVER_FETCHERS.get(cfg.get("driver")))
+    for eq_id, cfg in EQUIPMENT_CONFIG.items()
+)
+_DISPATCH_BY_ID = {entry[0]: entry for entry in _DISPATCH}
+
+def _fetch_one(entry: Tuple, last_check: str) -> Dict[str, Any]:
+    """Fetches live status for one configured device."""
+    eq_id, eq_type, ip, fetch = entry
+
+    # Default Basic Info
+    device_data = {
+        "id": eq_id,
+        "type": eq_type,
+        "status": "Unknown",
+        "last_check": last_check
+    }
+
+    # Dispatch to specific connection handler
+    if fetch is not None:
+        device_data.update(_cached_details(fetch, ip))
 
-    for eq_id, config in EQUIPMENT_CONFIG.items():
-        driver = config.get("driver")
-        ip = config.get("ip")
+    return device_data
+
+def _poll_all() -> Dict[str, Any]:
+    """Polls every configured device in parallel."""
+    # One timestamp for the whole poll
+    last_check = time.strftime("%Y-%m-%d %H:%M:%S")
+    futures = [_POLL_POOL.submit(_fetch_one, entry, last_check) for entry in _DISPATCH]
+
+    # Keep configuration order in the result
+    return {entry[0]: future.result() for entry, future in zip(_DISPATCH, futures)}
+
+# Latest poll result kept by the background refresher (see start_status_refresher)
+_SNAPSHOT: Dict[str, Any] = {}
+_refresher: Optional[threading.Thread] = None
+# Stop flag of the current refresher. Each refresher gets its own, so one
+# that is still finishing a slow poll after stop_status_refresher() gave up
+# waiting is never restarted by a later start.
+_refresher_stop: Optional[threading.Event] = None
+
+# Devices whose status changed, published by the refresher as
+# (eq_id, device_data). Bounded: when nobody listens, new changes are dropped
+# and readers fall back to get_all_equipment().
+status_bus: "queue.Queue[Tuple[str, Dict[str, Any]]]" = queue.Queue(maxsize=256)
+
+def _without_timestamp(device_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Device data minus last_check, for change detection."""
+    return {k: v for k, v in device_data.items() if k != "last_check"}
+
+# While no device changes, the refresher stretches its poll interval by
+# REFRESH_BACKOFF per round, up to MAX_REFRESH_INTERVAL seconds; any change
+# brings it back to the requested interval
+REFRESH_BACKOFF = 1.5
+MAX_REFRESH_INTERVAL = 10.0
+
+def _refresh_loop(interval: float, stop: threading.Event, snapshot: Dict[str, Any]):
+    """
+    Re-polls all devices every 'interval' seconds (longer while idle) into
+    'snapshot' until 'stop' is set.
+    """
+    wait = interval
+    # A seeded snapshot is fresh; wait before the first poll
+    if snapshot and stop.wait(wait):
+        return
+    while not stop.is_set():
+        try:
+            fresh = _poll_all()
+        except Exception:
+            fresh = {} # Keep the previous snapshot; try again next round
 
-        # Default Basic Info
-        device_data = {
-            "id": eq_id,
-            "type": config["type"],
-            "status": "Unknown",
-            "last_check": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
+        # Stopped during the poll: publish nothing
+        if stop.is_set():
+            return
 
-        # Dispatch to specific connection handler
-        if driver == "toptica_dlc":
-            details = get_laser_details(ip)
-            device_data.update(details)
+        changed = False
+        for eq_id, device_data in fresh.items():
+            previous = snapshot.get(eq_id)
+            if previous is None or _without_timestamp(previous) != _without_timestamp(device_data):
+                changed = True
+                try:
+                    status_bus.put_nowait((eq_id, device_data))
+                except queue.Full:
+                    pass
+        snapshot.update(fresh)
 
-        elif driver == "montana":
-            details = get_cryostat_details(ip)
-            device_data.update(details)
+        if changed:
+            wait = interval
+        else:
+            wait = min(wait * REFRESH_BACKOFF, max(interval, MAX_REFRESH_INTERVAL))
+        stop.wait(wait)
 
-        elif driver == "mock":
-            device_data["status"] = "Idle"
-            device_data["details"] = "Mock Device"
+def start_status_refresher(interval: float = 1.0, seed: Optional[Dict[str, Any]] = None):
+    """
+    Starts a daemon thread that keeps a status snapshot up to date, so
+    get_all_equipment returns without touching the network. Opt-in: one-shot
+    commands should not poll hardware in the background. Pass the result of
+    a poll just made as 'seed' to skip polling the hardware again right away.
+    """
+    global _refresher, _refresher_stop, _SNAPSHOT
+    if _refresher is not None and _refresher.is_alive():
+        return
+    # Fresh flag and snapshot: a refresher left over from an earlier stop
+    # keeps writing only to its own
+    _refresher_stop = threading.Event()
+    _SNAPSHOT = dict(seed) if seed else {}
+    _refresher = threading.Thread(target=_refresh_loop,
+                                  args=(interval, _refresher_stop, _SNAPSHOT),
+                                  name="equipment-refresher", daemon=True)
+    _refresher.start()
 
-        results[eq_id] = device_data
+def stop_status_refresher():
+    """Stops the background refresher; later calls poll devices directly."""
+    global _refresher, _refresher_stop, _SNAPSHOT
+    if _refresher_stop is not None:
+        _refresher_stop.set()
+    if _refresher is not None:
+        _refresher.join(timeout=5.0)
+    _refresher = None
+    _refresher_stop = None
+    _SNAPSHOT = {}
 
-    return results
+    # Drop unread changes so the next listener starts clean
+    while True:
+        try:
+            status_bus.get_nowait()
+        except queue.Empty:
+            break
+
+# Last full poll as (monotonic time, data), reused for ALL_EQUIPMENT_TTL
+# seconds so bursts of status/inspect calls share one poll
+_ALL_CACHE: Tuple[float, Dict[str, Any]] = (0.0, {})
+ALL_EQUIPMENT_TTL = 0.25
+
+def invalidate_equipment_cache():
+    """Forgets cached device reads, e.g. after a command changed a setting."""
+    global _ALL_CACHE
+    _ALL_CACHE = (0.0, {})
+    with _DETAILS_LOCK:
+        _DETAILS_CACHE.clear()
+
+def _recent_poll() -> Optional[Dict[str, Any]]:
+    """The last full poll if it is younger than ALL_EQUIPMENT_TTL."""
+    ts, data = _ALL_CACHE
+    if data and time.monotonic() - ts < ALL_EQUIPMENT_TTL:
+        return data
+    return None
+
+def get_all_equipment() -> Dict[str, Any]:
+    """
+    Fetches live status from all configured devices.
+    Devices are polled in parallel, so the call takes as long as the slowest
+    device rather than the sum of all of them. While the background
+    refresher runs, its latest snapshot is returned instead.
+    """
+    global _ALL_CACHE
+    if _refresher is not None and _SNAPSHOT:
+        return dict(_SNAPSHOT)
+
+    data = _recent_poll()
+    if data is None:
+        data = _poll_all()
+        _ALL_CACHE = (time.monotonic(), data)
+    return dict(data)
 
 def get_equipment_by_id(equipment_id: str) -> Optional[Dict[str, Any]]:
     """Fetches details for a single device."""
-    config = EQUIPMENT_CONFIG.get(equipment_id)
-    if not config:
+    entry = _DISPATCH_BY_ID.get(equipment_id)
+    if not entry:
         return None
 
-    driver = config.get("driver")
-    ip = config.get("ip")
+    eq_id, eq_type, ip, fetch = entry
+
+    if fetch is not None and fetch is not _mock_details:
+        # Reuse a device entry from a very recent full poll
+        recent = _recent_poll()
+        if recent is not None and eq_id in recent:
+            return dict(recent[eq_id])
 
     device_data = {
-        "id": equipment_id,
-        "type": config["type"],
-        "last_check": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        "id": eq_id,
+        "type": eq_type,
+        "last_check": time.strftime("%Y-%m-%d %H:%M:%S")
     }
 
-    if driver == "toptica_dlc":
-        device_data.update(get_laser_details(ip))
-    elif driver == "montana":
-        device_data.update(get_cryostat_details(ip))
+    if fetch is not None and fetch is not _mock_details:
+        device_data.update(_cached_details(fetch, ip))
     else:
         device_data["status"] = "Idle (Mock)"
 
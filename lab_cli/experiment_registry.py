@@ -10,8 +10,9 @@ def load_experiments() -> Dict[str, List[Dict[str, Any]]]:
     if not os.path.exists(EXPERIMENTS_FILE):
         return {}
     try:
-        with open(EXPERIMENTS_FILE, "r") as f:
-            return json.load(f)
+        # Bytes, so UTF-8 written by the orjson path in main.py is detected
+        with open(EXPERIMENTS_FILE, "rb") as f:
+            return json.loads(f.read())
     except json.JSONDecodeError:
         return {}
 
@@ -4,26 +4,35 @@ from rich.console import Console
 from rich.table import Table
 from rich.prompt import Prompt
 from rich.live import Live
+from rich.progress import Progress
+from rich.markup import escape
 import shlex
+import string
+import queue
 import time
 import sys
 import inspect
 import os
 import json
+import copy
 import numpy as np # Ensure numpy is imported for run-loop
-from typing import List
+from typing import List, Optional
+from functools import lru_cache
+from contextlib import nullcontext
 
-from . import actions
-# Force load the plugins
-from .actions import laser_actions
-from .actions import cryo_actions
-from .actions import general_actions
+# Optional faster JSON library for the experiments file
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Application Modules
+# (action plugins are imported on first registry access, see actions._ensure_plugins)
 from .experiment_registry import save_experiment, get_experiment
 from .actions import get_all_actions, get_action
 from .equipment_api import get_all_equipment, get_equipment_by_id, \
-get_magnet_temp_reading
+get_magnet_temp_reading, start_status_refresher, stop_status_refresher, status_bus, \
+invalidate_equipment_cache
 
 
 # Check Temp 3 (Magnet cryostat for overheating)
@@ -70,39 +79,79 @@ console = Console()
 EXPERIMENTS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), \
                                 "user_experiments.json")
 
+# Parsed experiments file, reused while its modification time is unchanged
+_EXP_CACHE = {"mtime": None, "data": None}
+
 def _load_experiments():
     """Helper to load the monolithic experiments file."""
-    if not os.path.exists(EXPERIMENTS_FILE):
+    try:
+        mtime = os.stat(EXPERIMENTS_FILE).st_mtime_ns
+    except OSError:
         return {}
+
+    # Callers edit the result in place, so hand out a copy
+    if _EXP_CACHE["mtime"] == mtime:
+        return copy.deepcopy(_EXP_CACHE["data"])
+
     try:
-        with open(EXPERIMENTS_FILE, 'r') as f:
-            return json.load(f)
-    except json.JSONDecodeError:
+        # Read bytes: both parsers detect the UTF-8 that either one writes,
+        # whatever the locale encoding
+        with open(EXPERIMENTS_FILE, 'rb') as f:
+            blob = f.read()
+        data = orjson.loads(blob) if orjson is not None else json.loads(blob)
+    except json.JSONDecodeError: # orjson.JSONDecodeError is a subclass
         console.print("[red]Error: user_experiments.json is corrupted.[/red]")
         return {}
     except Exception as e:
         console.print(f"[red]Error loading experiments: {e}[/red]")
         return {}
 
+    _EXP_CACHE["mtime"], _EXP_CACHE["data"] = mtime, data
+    return copy.deepcopy(data)
+
 def _save_experiments(data):
     """Helper to save the monolithic experiments file."""
+    tmp_path = EXPERIMENTS_FILE + ".tmp"
     try:
-        with open(EXPERIMENTS_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
-        return True
+        if orjson is not None:
+            # orjson only offers 2-space indentation
+            blob = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        else:
+            # Serialize in memory, then write once (json.dump writes per token)
+            blob = json.dumps(data, indent=4).encode('utf-8')
+
+        # Write a temporary file and swap it in, so a failed save leaves the
+        # previous file intact
+        with open(tmp_path, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp_path, EXPERIMENTS_FILE)
     except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        _EXP_CACHE["mtime"] = None
         console.print(f"[red]Error saving experiments: {e}[/red]")
         return False
 
+    # What we just wrote is the new cached copy
+    _EXP_CACHE["mtime"] = os.stat(EXPERIMENTS_FILE).st_mtime_ns
+    _EXP_CACHE["data"] = copy.deepcopy(data)
+    return True
+
+def _format_step(step: dict) -> str:
+    """One-line menu description of a step: type and parameters."""
+    step_type = step.get('type', 'Unknown')
+    params = ", ".join([f"{k}={v}" for k, v in step.items() if k != "type"])
+    return f"[cyan]{step_type}[/cyan] ({params})"
+
 def _edit_experiment_steps(exp_name: str, steps: list, full_data: dict):
     """Helper to edit steps within a specific experiment."""
+    # Formatted menu lines, refreshed only for steps that change
+    display_cache = [_format_step(step) for step in steps]
+
     while True:
         console.print(f"\n[bold underline]Editing Experiment: {exp_name}[/bold underline]")
-        for i, step in enumerate(steps):
-            # Format step for display
-            step_type = step.get('type', 'Unknown')
-            params = ", ".join([f"{k}={v}" for k, v in step.items() if k != "type"])
-            console.print(f"{i+1}. [cyan]{step_type}[/cyan] ({params})")
+        for i, line in enumerate(display_cache):
+            console.print(f"{i+1}. {line}")
 
         choice = Prompt.ask("\nSelect Step ID to edit (or 'save', 'cancel', 'add')")
 
@@ -142,6 +191,7 @@ def _edit_experiment_steps(exp_name: str, steps: list, full_data: dict):
         if param_choice == 'delete':
             if typer.confirm(f"Delete step {idx+1}?"):
                 steps.pop(idx)
+                display_cache.pop(idx)
                 console.print("[red]Step removed.[/red]")
             continue
 
@@ -149,6 +199,7 @@ def _edit_experiment_steps(exp_name: str, steps: list, full_data: dict):
         current_val = selected_step.get(param_choice)
         new_val = Prompt.ask(f"New value for '{param_choice}'", default=str(current_val))
         selected_step[param_choice] = new_val
+        display_cache[idx] = _format_step(selected_step)
         console.print(f"[green]Updated {param_choice} -> {new_val}[/green]")
 
 
@@ -222,6 +273,95 @@ def manage_experiments():
 
 # --- MONITORING COMMANDS ---
 
+# Status column colours (anything else is shown red)
+_STATUS_STYLES = {"Active": "green", "Idle": "yellow"}
+# Device fields that are not shown as readings
+_SKIP_KEYS = frozenset({"id", "type", "status", "last_check", "details"})
+# Placeholder for absent keys when comparing device data
+_MISSING = object()
+# Reading keys shown for each device data layout (tuple of its keys)
+_READING_KEYS = {}
+# Status rows reformatted between clock checks, and the time allowed for
+# one redraw; rows left over are done on the next pass
+ROW_BATCH = 32
+FRAME_BUDGET = 0.016
+
+def _reading_keys(data: dict) -> tuple:
+    """
+    Numeric fields of a device shown as readings. Found once per data layout;
+    drivers return a fixed set of fields for each outcome (connected,
+    offline, error).
+    """
+    schema = tuple(data)
+    keys = _READING_KEYS.get(schema)
+    if keys is None:
+        keys = _READING_KEYS[schema] = tuple(
+            key for key, val in data.items()
+            if key not in _SKIP_KEYS and isinstance(val, (int, float)))
+    return keys
+
+def _device_signature(data: dict) -> tuple:
+    """The displayed values of a device; equal signatures render the same row."""
+    return (data.get("type"), data.get("status"),
+            *(data[key] for key in _reading_keys(data)))
+
+def _status_row(eq_id: str, data: dict) -> tuple:
+    """Formats one device's cells for the status table."""
+    # Status Coloring
+    status = data.get("status", "Unknown")
+    style = _STATUS_STYLES.get(status, "red")
+
+    # Format Readings (Generic approach)
+    readings_str = ", ".join([f"{key}={data[key]}" for key in _reading_keys(data)]) or "-"
+
+    return (
+        eq_id,
+        data.get("type", "Unknown"),
+        f"[{style}]{status}[/{style}]",
+        readings_str
+    )
+
+def _refresh_rows(equipment_data: dict, row_cache: dict, signatures: dict,
+                  budget: float = FRAME_BUDGET) -> bool:
+    """
+    Reformats the rows whose signature changed into row_cache
+    ({eq_id: (signature, cells)}), ROW_BATCH at a time, until budget seconds
+    have passed. Returns True once every row is current.
+    """
+    stale = [eq_id for eq_id, sig in signatures.items()
+             if eq_id not in row_cache or row_cache[eq_id][0] != sig]
+    deadline = time.perf_counter() + budget
+    for i in range(0, len(stale), ROW_BATCH):
+        if i and time.perf_counter() > deadline:
+            return False
+        for eq_id in stale[i:i + ROW_BATCH]:
+            row_cache[eq_id] = (signatures[eq_id], _status_row(eq_id, equipment_data[eq_id]))
+        # Let the poller threads and Ctrl+C in between batches
+        time.sleep(0)
+    return True
+
+def _build_status_table(equipment_data: dict, row_cache: dict = None) -> Table:
+    """
+    Builds the status table for one poll of all devices. With row_cache
+    (filled by _refresh_rows), the cached cells are used; devices not
+    formatted yet show a placeholder row.
+    """
+    table = Table(title=f"Lab Equipment Status (Updated: {time.strftime('%H:%M:%S')})")
+    table.add_column("ID", style="cyan", no_wrap=True)
+    table.add_column("Type", style="magenta")
+    table.add_column("Status", justify="center")
+    table.add_column("Key Readings", style="green")
+
+    for eq_id, data in equipment_data.items():
+        if row_cache is None:
+            table.add_row(*_status_row(eq_id, data))
+        elif eq_id in row_cache:
+            table.add_row(*row_cache[eq_id][1])
+        else:
+            table.add_row(eq_id, data.get("type", "Unknown"), "[dim]...[/dim]", "-")
+
+    return table
+
 @app.command("status")
 def status_monitor(refresh_rate: float = 2.0):
     """
@@ -231,46 +371,52 @@ def status_monitor(refresh_rate: float = 2.0):
     console.print("[bold blue]Starting Equipment Monitor... (Press Ctrl+C to stop)[/bold blue]")
 
     try:
-        with Live(console=console, refresh_per_second=1) as live:
+        # Poll once, then let the background refresher continue from that
+        # result (it waits refresh_rate before its own first poll); changes
+        # arrive on status_bus
+        equipment_data = get_all_equipment()
+        start_status_refresher(refresh_rate, seed=equipment_data)
+
+        # Live redraws in place; piped or logged output gets plain tables
+        # without cursor escape codes
+        live = Live(console=console, refresh_per_second=1) if console.is_terminal else None
+        with live if live is not None else nullcontext():
+            show = live.update if live is not None else console.print
+            prev_signatures = None
+            row_cache = {}
+            pending = False
             while True:
-                # Fetch live data
-                equipment_data = get_all_equipment()
-
-                # Build Table
-                table = Table(title=f"Lab Equipment Status (Updated: {time.strftime('%H:%M:%S')})")
-                table.add_column("ID", style="cyan", no_wrap=True)
-                table.add_column("Type", style="magenta")
-                table.add_column("Status", justify="center")
-                table.add_column("Key Readings", style="green")
-
-                for eq_id, data in equipment_data.items():
-                    # Status Coloring
-                    status = data.get("status", "Unknown")
-                    style = "green" if status == "Active" else "red"
-                    if status == "Idle": style = "yellow"
-
-                    # Format Readings (Generic approach)
-                    readings = []
-                    # We look for common scientific keys dynamically
-                    for key, val in data.items():
-                        if key in ["id", "type", "status", "last_check", "details"]: continue
-                        if isinstance(val, (int, float)):
-                            readings.append(f"{key}={val}")
-
-                    readings_str = ", ".join(readings) if readings else "-"
-
-                    table.add_row(
-                        eq_id,
-                        data.get("type", "Unknown"),
-                        f"[{style}]{status}[/{style}]",
-                        readings_str
-                    )
-
-                live.update(table)
-                time.sleep(refresh_rate)
+                # Skip the rebuild when no device's displayed values changed
+                # (the title then shows when the readings last changed)
+                signatures = {eq_id: _device_signature(data)
+                              for eq_id, data in equipment_data.items()}
+                if pending or signatures != prev_signatures:
+                    prev_signatures = signatures
+                    # Large labs are formatted over several passes so a
+                    # redraw never holds up the loop for long
+                    pending = not _refresh_rows(equipment_data, row_cache, signatures)
+                    show(_build_status_table(equipment_data, row_cache))
+
+                # Wait for changed devices; refresh_rate bounds the wait, after
+                # which the latest snapshot is taken in case changes were dropped.
+                # Unfinished rows only wait one frame.
+                got_update = False
+                try:
+                    eq_id, data = status_bus.get(timeout=FRAME_BUDGET if pending else refresh_rate)
+                    equipment_data[eq_id] = data
+                    got_update = True
+                    # Take everything else already queued
+                    while True:
+                        eq_id, data = status_bus.get_nowait()
+                        equipment_data[eq_id] = data
+                except queue.Empty:
+                    if not got_update and not pending:
+                        equipment_data = get_all_equipment()
 
     except KeyboardInterrupt:
         console.print("\n[bold yellow]Monitor stopped.[/bold yellow]")
+    finally:
+        stop_status_refresher()
 
 
 @app.command("inspect")
@@ -291,6 +437,55 @@ def inspect_device(device_id: str):
 
 # --- GENERIC CONTROL COMMANDS ---
 
+@lru_cache(maxsize=None)
+def _param_names(func, required_only: bool = False) -> tuple:
+    """
+    Ordered parameter names of an action function, without 'context' (the
+    system injects it, the user shouldn't type it). With required_only,
+    parameters that have defaults are left out.
+    """
+    code = getattr(func, "__code__", None)
+    if code is None:
+        # Not a plain function (e.g. a partial); fall back to inspect
+        params = inspect.signature(func).parameters.values()
+        return tuple(p.name for p in params if p.name != "context" and
+                     (not required_only or p.default is inspect.Parameter.empty))
+
+    names = code.co_varnames[:code.co_argcount]
+    if required_only:
+        names = names[:len(names) - len(func.__defaults__ or ())]
+    return tuple(n for n in names if n != "context")
+
+# Resolved actions by name: (action_func, param_names, required_params).
+# Misses are not stored, so actions registered later are still found.
+_ACTION_CACHE = {}
+
+def _resolve_action(action_name: str):
+    """
+    Returns (action_func, param_names, required_params) for a registered
+    action, or None if it is unknown. Parameters are inspected once per name.
+    """
+    hit = _ACTION_CACHE.get(action_name)
+    if hit is not None:
+        return hit
+
+    action_def = get_action(action_name)
+    if not action_def:
+        return None
+
+    if hasattr(action_def, "params"):
+        # It is a wrapper object
+        param_names = required_params = tuple(action_def.params)
+    else:
+        # It is a raw function
+        param_names = _param_names(action_def)
+        # Parameters with defaults (e.g. file_format) are optional for 'run'
+        required_params = _param_names(action_def, required_only=True)
+
+    action_func = action_def.func if hasattr(action_def, "func") else action_def
+    hit = _ACTION_CACHE[action_name] = (action_func, param_names, required_params)
+    return hit
+
 @app.command("run",
     context_settings={"allow_extra_args": True, "ignore_unknown_options": True}
 )
@@ -298,24 +493,13 @@ def run_action_cli(ctx: typer.Context, action_name: str):
     """
     Executes ANY registered action immediately.
     """
-    # Look up the action
-    action_def = get_action(action_name)
-    if not action_def:
+    # Look up the action and its callable function / params
+    resolved = _resolve_action(action_name)
+    if resolved is None:
         console.print(f"[red]Error: Action '{action_name}' not found.[/red]")
         console.print("Available actions: " + ", ".join(get_all_actions().keys()))
         return
-
-    # Determine params and callable function
-    if hasattr(action_def, "params") and hasattr(action_def, "func"):
-        # It is a wrapper object
-        required_params = action_def.params
-        action_func = action_def.func
-    else:
-        # It is a raw function
-        sig = inspect.signature(action_def)
-        # We filter out 'context' because the system injects it, the user shouldn't type it
-        required_params = [p for p in sig.parameters if p != "context"]
-        action_func = action_def
+    action_func, _, required_params = resolved
 
     # Parse extra arguments
     kwargs = {}
@@ -325,13 +509,15 @@ def run_action_cli(ctx: typer.Context, action_name: str):
             key = key.lstrip("-")
             kwargs[key] = value
 
-    # Check for missing parameters
-    missing = [p for p in required_params if p not in kwargs]
-    if missing:
-        console.print(f"[yellow]Missing parameters for '{action_name}':[/yellow]")
-        for param in missing:
-            val = Prompt.ask(f"Enter value for '{param}'")
-            kwargs[param] = val
+    # Prompt for missing parameters as they are found
+    header_shown = False
+    for param in required_params:
+        if param in kwargs:
+            continue
+        if not header_shown:
+            console.print(f"[yellow]Missing parameters for '{action_name}':[/yellow]")
+            header_shown = True
+        kwargs[param] = Prompt.ask(f"Enter value for '{param}'")
 
     # Run the Action
     console.print(f"[bold]Running {action_name}...[/bold]")
@@ -344,10 +530,39 @@ def run_action_cli(ctx: typer.Context, action_name: str):
             console.print(f"[red]✘ Action {action_name} failed.[/red]")
     except Exception as e:
         console.print(f"[bold red]Error executing action: {e}[/bold red]")
+    finally:
+        # The action may have changed a setting; don't show a stale read next
+        invalidate_equipment_cache()
 
 
 # --- EXPERIMENT BUILDER COMMANDS ---
 
+def _parse_key_values(raw: str) -> dict:
+    """
+    Parses 'a=1, b="two words"' into {'a': '1', 'b': 'two words'}.
+    Unbalanced quotes or a token without '=' (e.g. an unquoted value with a
+    space) give an empty dict, so every value is asked for instead.
+    """
+    lexer = shlex.shlex(raw, posix=True)
+    lexer.whitespace += ","
+    lexer.whitespace_split = True
+    lexer.commenters = "" # '#' is ordinary text in values
+    try:
+        tokens = list(lexer)
+    except ValueError:
+        console.print("[yellow]Could not parse that line; asking for each value.[/yellow]")
+        return {}
+
+    values = {}
+    for token in tokens:
+        if "=" not in token:
+            console.print(f"[yellow]'{escape(token)}' is not key=value (quote values with spaces); "
+                          f"asking for each value.[/yellow]")
+            return {}
+        key, value = token.split("=", 1)
+        values[key.strip()] = value
+    return values
+
 @app.command("define")
 def define_experiment(name: str):
     """
@@ -356,30 +571,48 @@ def define_experiment(name: str):
     console.print(f"[bold green]Defining Generic Experiment: {name}[/bold green]")
 
     actions = get_all_actions()
+    # The registry does not change while defining, so build the menu once
+    choices = list(actions.keys()) + ["finish"]
     steps = []
 
     while True:
-        choices = list(actions.keys()) + ["finish"]
         cmd_type = Prompt.ask("\nSelect Action", choices=choices)
 
         if cmd_type == "finish":
             break
 
-        action_def = actions[cmd_type]
         step_data = {"type": cmd_type}
 
         # Inspect parameters
-        if hasattr(action_def, "params"):
-             required_params = action_def.params
-        else:
-             sig = inspect.signature(action_def)
-             required_params = [p for p in sig.parameters if p != "context"]
+        action_func, param_names, required_params = _resolve_action(cmd_type)
+        # Optional parameters are offered with their default (e.g. file_format)
+        defaults = {}
+        if len(param_names) != len(required_params):
+            signature = inspect.signature(action_func).parameters
+            defaults = {p: "" if signature[p].default is None else str(signature[p].default)
+                        for p in param_names if p not in required_params and p in signature}
 
         console.print(f"[italic]Configuring {cmd_type}... (Use {{var}} for variables)[/italic]")
 
+        # All parameters on one line (key=value, separated by spaces or commas);
+        # anything left out is asked for individually below
+        given = {}
+        if param_names:
+            hint = ", ".join(f"{p}={defaults.get(p, '')}" for p in param_names)
+            raw = Prompt.ask(f"Parameters ({escape(hint)})", default="")
+            given = _parse_key_values(raw)
+            unknown = [k for k in given if k not in param_names]
+            if unknown:
+                console.print(f"[yellow]Ignoring unknown parameters: {', '.join(unknown)}[/yellow]")
+
         # Loop over the FIXED parameter list
-        for param in required_params:
-            val = Prompt.ask(f"Value for '{param}'")
+        for param in param_names:
+            val = given.get(param)
+            if not val:
+                if param in defaults:
+                    val = Prompt.ask(f"Value for '{param}'", default=defaults[param])
+                else:
+                    val = Prompt.ask(f"Value for '{param}'")
             step_data[param] = val
 
         steps.append(step_data)
@@ -388,6 +621,201 @@ def define_experiment(name: str):
     save_experiment(name, steps)
     console.print(f"[bold green]Saved '{name}' with {len(steps)} steps.[/bold green]")
 
+def _range_values(start: float, end: float, step: float) -> list:
+    """
+    Values from start to end (inclusive when it lies on the grid) in
+    increments of step, rounded to 5 decimals. The direction comes from
+    start/end, so the sign of step does not matter.
+    """
+    # Number of whole steps that fit, with the same 1e-4 step tolerance for
+    # reaching 'end' that the old arange buffer had
+    span = end - start
+    n = int(np.floor(abs(span) / abs(step) + 1e-4)) + 1
+    last = start + np.sign(span) * (n - 1) * abs(step)
+    return np.round(np.linspace(start, last, n), 5).tolist()
+
+def _resolve_steps(steps: list) -> list:
+    """
+    Looks up each step's action and parameter names once, so the loops over
+    variable values only substitute and call.
+    Returns [(step_config, action_name, action_func, templates)], where
+    templates is [(param, raw_val, needs_format)]; action_func is None for
+    unknown actions.
+    """
+    resolved = []
+    for step_config in steps:
+        action_name = step_config["type"]
+        action_func, param_names, _ = _resolve_action(action_name) or (None, (), ())
+
+        # Only values containing braces need .format() on every iteration
+        templates = []
+        for param in param_names:
+            raw_val = str(step_config.get(param, ""))
+            templates.append((param, raw_val, "{" in raw_val or "}" in raw_val))
+
+        resolved.append((step_config, action_name, action_func, templates))
+    return resolved
+
+# Shared parser for step templates (see _compile_template)
+_FORMATTER = string.Formatter()
+
+class _Safe(dict):
+    """Context for format_map that leaves unknown {names} in place."""
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+def _substitute(templates: list, context: dict) -> dict:
+    """Builds the kwargs for one step by filling {var} placeholders from context."""
+    safe_context = _Safe(context)
+    kwargs = {}
+    for param, raw_val, needs_format in templates:
+        if needs_format:
+            try:
+                raw_val = raw_val.format_map(safe_context)
+            except (ValueError, IndexError, AttributeError, TypeError):
+                pass # Stray braces, positional or attribute fields: leave as typed
+        kwargs[param] = raw_val
+
+    kwargs["context"] = context
+    return kwargs
+
+def _compile_template(raw_val: str):
+    """
+    Pre-parses a step value into (literal, field) segments for templates
+    made only of plain {name} fields. Returns None when format_map is still
+    needed (format specs, conversions, attribute/index access, bad braces).
+    """
+    try:
+        parsed = list(_FORMATTER.parse(raw_val))
+    except ValueError:
+        return None
+
+    segments = []
+    for text, field, spec, conversion in parsed:
+        if field is not None and (spec or conversion or not field.isidentifier()):
+            return None
+        segments.append((text, field))
+    return tuple(segments)
+
+def _single_field(segments):
+    """
+    (prefix, field, suffix) when the pre-parsed template has exactly one
+    field, the usual "{x}" sweep value; otherwise None.
+    """
+    if segments is None:
+        return None
+    fields = [i for i, (_, field) in enumerate(segments) if field is not None]
+    if len(fields) != 1:
+        return None
+    i = fields[0]
+    return ("".join(text for text, _ in segments[:i + 1]), segments[i][1],
+            "".join(text for text, _ in segments[i + 1:]))
+
+def _template_fields(raw_val: str):
+    """
+    Context names a format_map template reads ({x:.2f} and {x.real} both
+    need x, {x:{w}} also needs w), or None if its braces do not parse.
+    """
+    names = set()
+    try:
+        for _, field, spec, _ in _FORMATTER.parse(raw_val):
+            if field is None:
+                continue
+            names.add(field.split(".", 1)[0].split("[", 1)[0])
+            if spec and "{" in spec:
+                # Nested fields in the format spec are looked up too
+                nested = _template_fields(spec)
+                if nested is None:
+                    return None
+                names |= nested
+    except ValueError:
+        return None
+    return frozenset(names)
+
+def _compile_runner(resolved: list):
+    """
+    Specializes resolved steps into a run(context) callable for run-loop.
+    Literal arguments are bound once; only templated ones are formatted per
+    iteration.
+    """
+    plan = []
+    for i, (step_config, action_name, action_func, templates) in enumerate(resolved):
+        literal = {param: raw_val for param, raw_val, needs_format in templates if not needs_format}
+        dynamic = []
+        for param, raw_val, needs_format in templates:
+            if needs_format:
+                segments = _compile_template(raw_val)
+                needed = _template_fields(raw_val) if segments is None else None
+                dynamic.append((param, raw_val, segments, _single_field(segments), needed))
+        plan.append((i, action_name, action_func, literal, dynamic))
+
+    def run(context: dict, errors: list = None) -> bool:
+        """
+        Runs every step for one context. Failures are printed, or collected
+        in errors when given. Returns True if all steps succeeded.
+        """
+        ok = True
+        for i, action_name, action_func, literal, dynamic in plan:
+            if action_func is None:
+                ok = False
+                if errors is None:
+                    console.print(f"[red]Unknown action: {action_name}[/red]")
+                else:
+                    errors.append(f"Unknown action: {action_name}")
+                continue
+
+            kwargs = dict(literal)
+            for param, raw_val, segments, single, needed in dynamic:
+                if single is not None:
+                    # One field: a lookup and two concatenations
+                    prefix, field, suffix = single
+                    value = context.get(field, _MISSING)
+                    raw_val = prefix + ("{" + field + "}" if value is _MISSING else str(value)) + suffix
+                elif segments is not None:
+                    # Pre-parsed {name} fields: plain lookups, no format parser
+                    parts = []
+                    for text, field in segments:
+                        parts.append(text)
+                        if field is not None:
+                            value = context.get(field, _MISSING)
+                            parts.append("{" + field + "}" if value is _MISSING else str(value))
+                    raw_val = "".join(parts)
+                elif needed is not None and needed <= context.keys():
+                    # Stray braces, positional or unknown fields were ruled
+                    # out above; only a spec that does not fit the value fails
+                    try:
+                        raw_val = raw_val.format_map(context)
+                    except (KeyError, ValueError, IndexError, AttributeError, TypeError):
+                        pass
+                # Anything else is left as typed
+                kwargs[param] = raw_val
+            kwargs["context"] = context
+
+            try:
+                # Call function
+                success = action_func(**kwargs)
+
+                if not success:
+                    ok = False
+                    if errors is None:
+                        console.print(f"[red]Step {i+1} ({action_name}) Failed![/red]")
+                    else:
+                        errors.append(f"Step {i+1} ({action_name}) Failed!")
+            except Exception as e:
+                ok = False
+                if errors is None:
+                    console.print(f"[red]Error in step {i+1}: {e}[/red]")
+                    import traceback
+                    traceback.print_exc()
+                else:
+                    errors.append(f"Error in step {i+1}: {e}")
+        return ok
+
+    return run
+
+# Sweeps longer than this default to --quiet
+QUIET_SWEEP_SIZE = 50
+
 @app.command("run-loop")
 def run_loop_generic(
     name: str,
@@ -397,6 +825,9 @@ def run_loop_generic(
     step: float = typer.Option(..., help="Step size"),
     safe_max: float = typer.Option(None, help="Pause if Magnet Temp (Ch3) > this value"),
     safe_min: float = typer.Option(None, help="Resume when Magnet Temp (Ch3) < this value"),
+    quiet: Optional[bool] = typer.Option(None, "--quiet/--verbose",
+        help=f"Show a progress bar and an error summary instead of per-value output "
+             f"(default: quiet for more than {QUIET_SWEEP_SIZE} values)"),
 ):
     """
     Loops ANY defined experiment over a specific variable.
@@ -411,9 +842,7 @@ def run_loop_generic(
     if safe_max is not None and safe_min is None:
         safe_min = safe_max - 2.0
 
-    # Handle range direction
-    if start > end and step > 0: step = -step
-    values = np.arange(start, end + step/10000.0, step)
+    values = _range_values(start, end, step)
 
     console.print(f"[bold]Looping '{name}' over {variable} ({start} -> {end})[/bold]")
     if safe_max:
@@ -421,62 +850,53 @@ def run_loop_generic(
 
     if not typer.confirm("Start?"): return
 
+    run_steps = _compile_runner(_resolve_steps(steps))
+
+    if quiet is None:
+        quiet = len(values) > QUIET_SWEEP_SIZE
+    if quiet:
+        _run_loop_quiet(run_steps, variable, values, safe_max, safe_min)
+        return
+
+    # Only the value changes between iteration headers
+    head, tail = f"\n[bold yellow]--- {variable} = ", " ---[/bold yellow]"
+    _p = console.print
+
     for val in values:
         # --- SAFETY CHECK BEFORE ITERATION ---
         _check_magnet_safety(safe_max, safe_min)
         # -------------------------------------
 
-        val = round(float(val), 5)
-        console.print(f"\n[bold yellow]--- {variable} = {val} ---[/bold yellow]")
-
-        context = {variable: val}
+        _p(head + str(val) + tail)
 
         # Execute Steps
-        for i, step_config in enumerate(steps):
+        run_steps({variable: val})
 
-            # Optional: Check safety between steps too if the experiment is slow
-            # _check_magnet_safety(safe_max, safe_min)
-
-            action_name = step_config["type"]
-            action_def = get_action(action_name)
-
-            if not action_def:
-                console.print(f"[red]Unknown action: {action_name}[/red]")
-                continue
+    console.print("\n[bold green]Loop Complete[/bold green]")
 
-            # Inspect parameters dynamically
-            if hasattr(action_def, "params"):
-                 param_names = action_def.params
+def _run_loop_quiet(run_steps, variable: str, values: list, safe_max, safe_min):
+    """
+    run-loop body for long sweeps: one progress bar instead of a header per
+    value, with failures collected and listed at the end.
+    """
+    errors = []
+    ok = 0
+    with Progress(console=console) as progress:
+        task = progress.add_task(f"Sweeping {variable}", total=len(values))
+        for val in values:
+            _check_magnet_safety(safe_max, safe_min)
+
+            step_errors = []
+            if run_steps({variable: val}, step_errors):
+                ok += 1
             else:
-                 sig = inspect.signature(action_def)
-                 param_names = [p for p in sig.parameters if p != "context"]
-
-            kwargs = {}
-            for param in param_names:
-                raw_val = str(step_config.get(param, ""))
-                try:
-                    formatted_val = raw_val.format(**context)
-                except (KeyError, ValueError, IndexError):
-                    formatted_val = raw_val
-                kwargs[param] = formatted_val
+                errors.extend(f"{variable} = {val}: {msg}" for msg in step_errors)
+            progress.update(task, advance=1)
 
-            kwargs["context"] = context
-
-            try:
-                # Call function
-                if hasattr(action_def, "func"):
-                    success = action_def.func(**kwargs)
-                else:
-                    success = action_def(**kwargs)
-
-                if not success:
-                    console.print(f"[red]Step {i+1} ({action_name}) Failed![/red]")
-            except Exception as e:
-                console.print(f"[red]Error in step {i+1}: {e}[/red]")
-                import traceback
-                traceback.print_exc()
-
-    console.print("\n[bold green]Loop Complete[/bold green]")
+    for msg in errors:
+        console.print(f"[red]{msg}[/red]")
+    style = "green" if ok == len(values) else "yellow"
+    console.print(f"\n[bold {style}]Loop Complete: {ok}/{len(values)} OK[/bold {style}]")
 
 """
 Define your experiments with placeholders as usual (e.g., {field}, {power}). Then, just type:
@@ -535,11 +955,7 @@ def run_multi(
                 parts = [float(x) for x in val_str.split(":")]
                 if len(parts) == 3:
                     start, end, step = parts
-                    # Handle negative steps
-                    if start > end and step > 0: step = -step
-                    # Create array with small buffer to include end value
-                    vals = np.arange(start, end + step/10000.0, step)
-                    vals = [round(x, 5) for x in vals.tolist()]
+                    vals = _range_values(start, end, step)
                 else:
                     console.print("[red]Range format must be start:end:step[/red]")
                     continue
@@ -565,62 +981,46 @@ def run_multi(
         console.print("Variables with fewer steps will repeat their last value.")
         if not typer.confirm("Continue?"): return
 
+    # Load and resolve every experiment once; None marks an unknown name
+    plans = []
+    for exp_name in experiments:
+        steps = get_experiment(exp_name)
+        plans.append((exp_name, _resolve_steps(steps) if steps else None))
+
     # Execution Loop
     console.print(f"\n[bold]Starting Multi-Variable Loop ({max_len} iterations)...[/bold]")
 
-    for i in range(max_len):
+    # Pad shorter lists with their last value so every iteration is a plain
+    # row lookup (values may be numbers or strings, so plain lists are kept)
+    names = list(variables)
+    aligned = [v + v[-1:] * (max_len - len(v)) for v in variables.values()]
+
+    for i, row in enumerate(zip(*aligned)):
         # Build Context for this iteration
-        context = {}
-        for var, val_list in variables.items():
-            # Get value safely (repeat last if index out of bounds)
-            idx = min(i, len(val_list) - 1)
-            context[var] = val_list[idx]
+        context = dict(zip(names, row))
 
         loop_info = ", ".join([f"{k}={v}" for k, v in context.items()])
         console.print(f"\n[bold yellow]=== Iteration {i+1}/{max_len}: {loop_info} ===[/bold yellow]")
 
         # Run Sequence
-        for exp_idx, exp_name in enumerate(experiments):
-            steps = get_experiment(exp_name)
-            if not steps:
+        for exp_idx, (exp_name, resolved) in enumerate(plans):
+            if resolved is None:
                 console.print(f"[red]Skipping unknown experiment: {exp_name}[/red]")
                 continue
 
             console.print(f"[bold cyan]  Running: {exp_name}[/bold cyan]")
 
             # Execute Steps
-            for step_idx, step_config in enumerate(steps):
-                action_name = step_config["type"]
-                action_def = get_action(action_name)
-
-                if not action_def:
+            for step_idx, (step_config, action_name, action_func, templates) in enumerate(resolved):
+                if action_func is None:
                     continue
 
-                # Inspect Params
-                if hasattr(action_def, "params"):
-                    param_names = action_def.params
-                else:
-                    sig = inspect.signature(action_def)
-                    param_names = [p for p in sig.parameters if p != "context"]
-
                 # Substitute Variables
-                kwargs = {}
-                for param in param_names:
-                    raw_val = str(step_config.get(param, ""))
-                    try:
-                        formatted_val = raw_val.format(**context)
-                    except (KeyError, ValueError, IndexError):
-                        formatted_val = raw_val
-                    kwargs[param] = formatted_val
-
-                kwargs["context"] = context
+                kwargs = _substitute(templates, context)
 
                 # Execute
                 try:
-                    if hasattr(action_def, "func"):
-                        action_def.func(**kwargs)
-                    else:
-                        action_def(**kwargs)
+                    action_func(**kwargs)
                 except Exception as e:
                     console.print(f"[red]    Error in {exp_name} step \
                                   {step_idx+1}: {e}[/red]")
@@ -635,6 +1035,20 @@ def run_multi(
 
 # --- INTERACTIVE SHELL ---
 
+@lru_cache(maxsize=256)
+def _tokenize(command: str) -> tuple:
+    """Splits a shell line into arguments; repeated lines reuse the result."""
+    return tuple(shlex.split(command))
+
+# Commands that only take plain positional arguments, called directly from
+# the shell instead of going through Click's parser: name -> (func, arg count).
+# Anything else (options, --help, 'run' with its extra args) goes through app().
+_DIRECT_COMMANDS = {
+    "inspect": (inspect_device, 1),
+    "define": (define_experiment, 1),
+    "manage": (manage_experiments, 0),
+}
+
 @app.command("interactive")
 def interactive_shell():
     """
@@ -655,11 +1069,27 @@ def interactive_shell():
                 continue
 
             # Process command
-            args = shlex.split(command)
+            # (a fresh list each time, since Click may consume it)
+            args = list(_tokenize(command))
+
+            # Run the command directly when it is a simple call, otherwise
+            # programmatically through typer
+            direct = _DIRECT_COMMANDS.get(args[0])
+            if direct is not None and len(args) - 1 == direct[1] \
+                    and not any(a.startswith("-") for a in args[1:]):
+                func, _ = direct
+            else:
+                func = None
 
-            # Run the typer command programmatically
             try:
-                app(args, standalone_mode=False)
+                if func is not None:
+                    try:
+                        func(*args[1:])
+                    except KeyboardInterrupt:
+                        # Like Click's Abort: Ctrl+C ends the command, not the shell
+                        console.print("\n[yellow]Aborted![/yellow]")
+                else:
+                    app(args, standalone_mode=False)
             except SystemExit:
                 pass # Prevent the shell from closing on command exit
             except Exception as e:
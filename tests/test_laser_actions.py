@@ -0,0 +1,224 @@
+import unittest
+from unittest import mock
+
+from lab_cli.actions import laser_actions
+
+
+class _Node:
+    """Stands in for an SDK parameter node; reject=True fails the next set()."""
+    def __init__(self, reject=False):
+        self.reject = reject
+        self.value = None
+
+    def set(self, value):
+        if self.reject:
+            self.reject = False
+            raise ValueError("value out of range")
+        self.value = value
+
+
+class _Scan:
+    """Read-only 'scan_begin' backed by a private node, like the DLC wide scan."""
+    def __init__(self, node):
+        self._scan_begin = node
+
+    @property
+    def scan_begin(self):
+        return self._scan_begin
+
+
+class ForceSetCacheTest(unittest.TestCase):
+    def setUp(self):
+        laser_actions._SETTER_CACHE.clear()
+
+    def tearDown(self):
+        laser_actions._SETTER_CACHE.clear()
+
+    def test_rejected_set_does_not_cache_private_attr_fallback(self):
+        # A rejected .set() falls through to rebinding the private attribute
+        rejected = _Scan(_Node(reject=True))
+        self.assertTrue(laser_actions._force_set(rejected, "scan_begin", 1500.0))
+        self.assertNotIn((_Scan, "scan_begin"), laser_actions._SETTER_CACHE)
+
+        # ...but later writes must still go through the SDK node
+        node = _Node()
+        fresh = _Scan(node)
+        self.assertTrue(laser_actions._force_set(fresh, "scan_begin", 1510.0))
+        self.assertIs(fresh._scan_begin, node)
+        self.assertEqual(node.value, 1510.0)
+
+    def test_sdk_setter_is_cached(self):
+        node = _Node()
+        self.assertTrue(laser_actions._force_set(_Scan(node), "scan_begin", 1500.0))
+        cached = laser_actions._SETTER_CACHE[(_Scan, "scan_begin")]
+        self.assertEqual(cached.__name__, "set_private_obj")
+        self.assertEqual(node.value, 1500.0)
+
+
+class _FakeDLC:
+    """Minimal DLCpro connection that records whether it was closed."""
+    def __init__(self, connection):
+        self.closed = False
+
+    def open(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class DlcSessionPoolTest(unittest.TestCase):
+    def setUp(self):
+        laser_actions._close_dlc_connections()
+        laser_actions._dlc_ip.cache_clear()
+        patches = [
+            mock.patch.object(laser_actions, "HAS_SDK", True),
+            mock.patch.object(laser_actions, "DLCpro", _FakeDLC, create=True),
+            mock.patch.object(laser_actions, "NetworkConnection", lambda ip: ip, create=True),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.addCleanup(laser_actions._dlc_ip.cache_clear)
+        self.addCleanup(laser_actions._close_dlc_connections)
+        self.addCleanup(laser_actions._SETTER_CACHE.clear)
+
+    def test_connection_is_reused(self):
+        with laser_actions.dlc_session() as first:
+            pass
+        with laser_actions.dlc_session() as second:
+            pass
+        self.assertIs(first, second)
+
+    def test_handled_sdk_failure_evicts_connection(self):
+        node = _Node(reject=True)
+        with laser_actions.dlc_session() as first:
+            # _force_set swallows the error, but the connection is suspect
+            laser_actions._force_set(_Scan(node), "scan_begin", 1500.0)
+        self.assertTrue(first.closed)
+        with laser_actions.dlc_session() as second:
+            pass
+        self.assertIsNot(first, second)
+
+    def test_nested_session_does_not_leak_connection(self):
+        with laser_actions.dlc_session() as outer:
+            with laser_actions.dlc_session() as inner:
+                self.assertIsNot(outer, inner)
+        self.assertTrue(inner.closed)
+        self.assertFalse(outer.closed)
+        self.assertEqual(len(laser_actions._DLC_POOL), 1)
+
+
+class GetDlcConnectionTest(unittest.TestCase):
+    def setUp(self):
+        laser_actions._dlc_ip.cache_clear()
+        self.addCleanup(laser_actions._dlc_ip.cache_clear)
+
+    def test_failures_are_reported_on_every_call(self):
+        with mock.patch.object(laser_actions, "HAS_SDK", False), \
+                mock.patch.object(laser_actions.console, "print") as printed:
+            self.assertEqual(laser_actions._get_dlc_connection(), (None, None))
+            self.assertEqual(laser_actions._get_dlc_connection(), (None, None))
+        self.assertEqual(printed.call_count, 2)
+
+    def test_missing_config_is_reported_on_every_call(self):
+        with mock.patch.object(laser_actions, "HAS_SDK", True), \
+                mock.patch.object(laser_actions, "DLCpro", _FakeDLC, create=True), \
+                mock.patch.object(laser_actions.console, "print") as printed:
+            self.assertEqual(laser_actions._get_dlc_connection("laser-99"), (None, None))
+            self.assertEqual(laser_actions._get_dlc_connection("laser-99"), (None, None))
+            self.assertEqual(laser_actions._get_dlc_connection()[0],
+                             laser_actions.EQUIPMENT_CONFIG["laser-01"]["ip"])
+        self.assertEqual(printed.call_count, 2)
+
+
+class _FakeDecopError(Exception):
+    """Plain SDK error: the laser answered with an error reply."""
+
+
+class _Recorder:
+    """Recorder data whose get_data() fails for counts above max_count."""
+    def __init__(self, max_count=None, error=None):
+        self.max_count = max_count
+        self.error = error
+        self.counts = []
+
+    def get_data(self, index, count):
+        self.counts.append(count)
+        if self.error is not None:
+            raise self.error
+        if count > self.max_count:
+            raise _FakeDecopError("Error: count too large")
+        return (index, count)
+
+
+def _fake_extract(name, raw):
+    index, count = raw
+    return {"x": list(range(index, index + count)), "y": [0.0] * count}
+
+
+class FetchRecorderTest(unittest.TestCase):
+    def setUp(self):
+        patches = [
+            mock.patch.object(laser_actions, "HAS_SDK", True),
+            mock.patch.object(laser_actions, "DecopError", _FakeDecopError, create=True),
+            mock.patch.object(laser_actions, "extract_float_arrays", _fake_extract, create=True),
+            mock.patch.object(laser_actions, "_recorder_chunk", None),
+            mock.patch.object(laser_actions.console, "print"),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_rejected_size_is_halved(self):
+        xs, _ = laser_actions._fetch_recorder_xy(_Recorder(max_count=2048), 8192)
+        self.assertEqual(list(xs), list(range(8192)))
+        self.assertEqual(laser_actions._recorder_chunk, 2048)
+
+    def test_connection_error_is_not_retried_smaller(self):
+        recorder = _Recorder(error=TimeoutError("timed out"))
+        with self.assertRaises(TimeoutError):
+            laser_actions._fetch_recorder_xy(recorder, 8192)
+        self.assertEqual(set(recorder.counts), {8192})
+        self.assertIsNone(laser_actions._recorder_chunk)
+
+
+class _ScanState:
+    """Wide-scan state that stays 'scanning' when read; updates come by subscription."""
+    def __init__(self):
+        self.callback = None
+
+    def get(self):
+        return 1
+
+    def subscribe(self, callback):
+        self.callback = callback
+        return mock.Mock()
+
+
+class _ScanDLC:
+    """DLC whose event loop delivers 'state = 0' on the first run()."""
+    def __init__(self):
+        self.state = _ScanState()
+        self.laser1 = mock.Mock()
+        self.laser1.wide_scan.state = self.state
+        self.runs = 0
+
+    def run(self, timeout):
+        self.runs += 1
+        self.state.callback(None, None, 0)
+
+    def stop(self):
+        pass
+
+
+class WaitForSweepTest(unittest.TestCase):
+    def test_subscription_update_ends_wait(self):
+        dlc = _ScanDLC()
+        with mock.patch.object(laser_actions.console, "print"):
+            laser_actions._wait_for_sweep(dlc, duration=60.0, max_wait_time=120.0)
+        self.assertEqual(dlc.runs, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
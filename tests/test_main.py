@@ -0,0 +1,90 @@
+import unittest
+from unittest import mock
+
+from lab_cli import main
+
+
+class CompileRunnerTest(unittest.TestCase):
+    def run_step(self, params, context):
+        """Runs one recording step through the run-loop compiler; returns its kwargs."""
+        calls = []
+
+        def action(**kwargs):
+            calls.append(kwargs)
+            return True
+
+        templates = [(param, raw, "{" in raw) for param, raw in params.items()]
+        run = main._compile_runner([({}, "record", action, templates)])
+        self.assertTrue(run(context, []))
+        return calls[0]
+
+    def test_plain_and_format_spec_fields(self):
+        kwargs = self.run_step({"a": "{x}", "b": "v{x}mV", "c": "{x:.2f}", "d": "{y}"},
+                               {"x": 1.5})
+        self.assertEqual(kwargs["a"], "1.5")
+        self.assertEqual(kwargs["b"], "v1.5mV")
+        self.assertEqual(kwargs["c"], "1.50")
+        self.assertEqual(kwargs["d"], "{y}")
+
+    def test_nested_spec_field_missing_is_left_as_typed(self):
+        kwargs = self.run_step({"a": "{x:{w}}"}, {"x": 1.5})
+        self.assertEqual(kwargs["a"], "{x:{w}}")
+
+    def test_nested_spec_field_present(self):
+        kwargs = self.run_step({"a": "{x:{w}}"}, {"x": 1.5, "w": ".1f"})
+        self.assertEqual(kwargs["a"], "1.5")
+
+
+class ParseKeyValuesTest(unittest.TestCase):
+    def test_quoted_and_comma_separated(self):
+        self.assertEqual(main._parse_key_values('message="hello world", seconds=2'),
+                         {"message": "hello world", "seconds": "2"})
+
+    def test_hash_is_kept(self):
+        self.assertEqual(main._parse_key_values("message=run#3"), {"message": "run#3"})
+        self.assertEqual(main._parse_key_values('message="run #3", seconds=2'),
+                         {"message": "run #3", "seconds": "2"})
+
+    def test_stray_token_asks_for_every_value(self):
+        # Unquoted spaces would otherwise truncate the value
+        self.assertEqual(main._parse_key_values("message=hello world"), {})
+        self.assertEqual(main._parse_key_values("message=run #3, seconds=2"), {})
+
+    def test_unbalanced_quotes(self):
+        self.assertEqual(main._parse_key_values('message="oops'), {})
+
+
+class DefineExperimentTest(unittest.TestCase):
+    def define(self, answers):
+        """
+        Runs 'define' with scripted prompt answers (None presses Enter);
+        returns the saved steps and the (prompt, default) pairs asked.
+        """
+        prompts = []
+
+        def ask(prompt, **kwargs):
+            prompts.append((prompt, kwargs.get("default")))
+            answer = answers.pop(0)
+            return kwargs.get("default") if answer is None else answer
+
+        with mock.patch.object(main.Prompt, "ask", side_effect=ask), \
+                mock.patch.object(main, "save_experiment") as save, \
+                mock.patch.object(main.console, "print"):
+            main.define_experiment("test")
+        return save.call_args[0][1], prompts
+
+    def test_optional_parameter_offers_its_default(self):
+        steps, prompts = self.define(
+            ["sweep-laser", "start_nm=1500 end_nm=1510 speed=1 power=5", None, "finish"])
+        self.assertEqual(steps[0]["file_format"], "parquet")
+        self.assertIn(("Value for 'file_format'", "parquet"), prompts)
+
+    def test_optional_parameter_on_the_line(self):
+        steps, _ = self.define(
+            ["sweep-laser", "start_nm=1500 end_nm=1510 speed=1 power=5 file_format=csv", "finish"])
+        self.assertEqual(steps[0], {"type": "sweep-laser", "start_nm": "1500", "end_nm": "1510",
+                                    "speed": "1", "power": "5", "file_format": "csv"})
+
+
+if __name__ == "__main__":
+    unittest.main()